@@ -1,19 +1,32 @@
 from conan.tools.apple import is_apple_os
 from conan.tools.build import build_jobs, check_min_cppstd, cross_building
-from conan.tools.files import chdir, get, mkdir, rename, replace_in_file, rm, rmdir, save
-from conan.tools.files.patches import apply_conandata_patches
+from conan.tools.files import chdir, download, get, load, mkdir, rename, rm, rmdir, save
 from conan.tools.microsoft import msvc_runtime_flag
 from conan import ConanFile
 from conan.errors import ConanException, ConanInvalidConfiguration
 from conans import tools
 from conan.tools.scm import Version
 
+import collections
+import concurrent.futures
+import datetime
+import filecmp
+import functools
 import glob
+import hashlib
+import json
+import logging
 import os
+import patch_ng
 import re
 import sys
 import shlex
 import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
 import yaml
 
 from conans import ConanFile
@@ -43,6 +56,58 @@ except ImportError:
 required_conan_version = ">=1.51.3"
 
 
+def extract_tar_members(tar, destination, strip_root=False):
+    """
+    Extract the members of an open tar file one by one, which also works for streams (mode "r|*").
+    """
+    # Python versions with extraction filters (3.12, and security releases of older ones) want one chosen explicitly
+    extract_args = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    for member in tar:
+        if strip_root:
+            member.name = member.name.split("/", 1)[1] if "/" in member.name else ""
+            if member.islnk():
+                member.linkname = member.linkname.split("/", 1)[1] if "/" in member.linkname else ""
+            if not member.name:
+                continue
+        if os.path.isabs(member.name) or ".." in member.name.split("/"):
+            raise ConanException(f"Refusing to extract {member.name} outside of {destination}")
+        tar.extract(member, destination, **extract_args)
+
+
+def extract_tar_from_command(command, destination, strip_root=False):
+    """
+    Extract the tar stream written to stdout by command (e.g. a parallel decompressor),
+    member by member, without buffering the archive.
+    When the command fails, the ConanException tells its exit code and error output, also when tarfile
+    stumbled over the truncated stream first.
+    """
+    # A file rather than a pipe: nobody reads stderr while the stream is extracted, a full pipe would block the command
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        error = None
+        try:
+            with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+                extract_tar_members(tar, destination, strip_root)
+        except (tarfile.TarError, EOFError) as e:
+            error = e
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise ConanException(f"{' '.join(command)} failed with exit code {returncode}" +
+                                 (f": {message}" if message else "")) from error
+    if error is not None:
+        raise ConanException(f"couldn't extract the output of {' '.join(command)}: {error}") from error
+
+
+# Bump when the way source() prepares the source tree changes, to invalidate the source cache
+SOURCE_CACHE_FORMAT = 1
+
+# Version of the layout of the dependencies-x.y.z.json index. Keep in sync with `rebuild-dependencies.py`.
+DEPENDENCY_INDEX_FORMAT = 1
+
 # When adding (or removing) an option, also add this option to the list in
 # `rebuild-dependencies.yml` and re-run that script.
 CONFIGURE_OPTIONS = (
@@ -126,6 +191,688 @@ disabled_lib_list = [
     'container'
 ]
 
+class BoostDependencyGraph(object):
+    """
+    Transitive closures of the module dependencies of a dependencies-x.y.z.yml file.
+    Both closures are computed in one topological pass, so queries are simple lookups.
+    """
+
+    def __init__(self, dependencies=None):
+        if dependencies is None:
+            return
+        super_modules = {module: set() for module in dependencies}
+        for module, module_dependencies in dependencies.items():
+            for dependency in module_dependencies:
+                super_modules[dependency].add(module)
+        order = self._topological_order(dependencies, super_modules)
+
+        self._dependent_modules = {}
+        for module in order:
+            closure = {module}
+            for dependency in dependencies[module]:
+                closure.update(self._dependent_modules[dependency])
+            self._dependent_modules[module] = frozenset(closure)
+
+        self._super_modules = {}
+        for module in reversed(order):
+            closure = {module}
+            for super_module in super_modules[module]:
+                closure.update(self._super_modules[super_module])
+            self._super_modules[module] = frozenset(closure)
+
+    @classmethod
+    def from_closures(cls, dependent_modules, super_modules):
+        """
+        create the graph from closures computed in advance (see rebuild-dependencies.py)
+        """
+        graph = cls()
+        graph._dependent_modules = {module: frozenset(closure) for module, closure in dependent_modules.items()}
+        graph._super_modules = {module: frozenset(closure) for module, closure in super_modules.items()}
+        return graph
+
+    @staticmethod
+    def _topological_order(dependencies, super_modules):
+        """
+        :return: list of all modules, every module comes after all of its dependencies
+        """
+        remaining = {module: len(set(module_dependencies)) for module, module_dependencies in dependencies.items()}
+        ready = sorted(module for module, count in remaining.items() if not count)
+        order = []
+        while ready:
+            module = ready.pop()
+            order.append(module)
+            for super_module in super_modules[module]:
+                remaining[super_module] -= 1
+                if not remaining[super_module]:
+                    ready.append(super_module)
+        if len(order) != len(dependencies):
+            cycle = sorted(set(dependencies).difference(order))
+            raise ConanException(f"Dependency cycle detected between boost modules: {cycle}")
+        return order
+
+    def all_dependent_modules(self, name):
+        """
+        :return: the module and all modules it (indirectly) depends on
+        """
+        return self._dependent_modules.get(name, frozenset((name,)))
+
+    def all_super_modules(self, name):
+        """
+        :return: the module and all modules that (indirectly) depend on it
+        """
+        return self._super_modules.get(name, frozenset((name,)))
+
+
+@functools.lru_cache(maxsize=16)
+def load_dependencies(dependencies_filepath, mtime, index_filepath, index_mtime):
+    """
+    Load a dependencies-x.y.z.yml file, using its precompiled json index when it is up to date.
+    Conan creates many recipe instances per process, the modification times are part of the arguments
+    so all of them share the parsed data until a file changes.
+    The returned data is shared, it must not be modified.
+    :return: tuple of the dependency data, its BoostDependencyGraph and whether a stale index was ignored
+    """
+    with open(dependencies_filepath, "rb") as f:
+        contents = f.read()
+    if index_mtime is not None:
+        with open(index_filepath, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") == DEPENDENCY_INDEX_FORMAT and index.get("yml_sha256") == hashlib.sha256(contents).hexdigest():
+            graph = BoostDependencyGraph.from_closures(index["closures"]["dependent_modules"], index["closures"]["super_modules"])
+            return index["data"], graph, False
+    data = yaml.safe_load(contents)
+    return data, BoostDependencyGraph(data["dependencies"]), index_mtime is not None
+
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl request of Linux to share the data blocks of one file with another (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def _reflink_file(src, dst):
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def _link_file(src, dst):
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    os.link(src, dst)
+
+
+def merge_tree(src, dst):
+    """
+    Move every file of src into dst, replacing the files that already exist there, then remove src.
+    """
+    for root, dirs, names in os.walk(src):
+        dst_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dst_root, exist_ok=True)
+        for name in names + [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            dst_path = os.path.join(dst_root, name)
+            if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                shutil.rmtree(dst_path)
+            os.replace(os.path.join(root, name), dst_path)
+    shutil.rmtree(src)
+
+
+def sync_tree(src, dst):
+    """
+    Make dst a copy of src writing only the files whose contents differ, and remove what src does not have.
+    The files written get a new modification time: b2 only rebuilds what is older than its sources, a copy keeping
+    the time of src could look older than the targets built from the previous contents.
+    :return: number of files written or removed
+    """
+    changes = 0
+    for root, dirs, names in os.walk(dst, topdown=False):
+        src_root = os.path.join(src, os.path.relpath(root, dst))
+        for name in names + [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            if not os.path.lexists(os.path.join(src_root, name)):
+                os.unlink(os.path.join(root, name))
+                changes += 1
+        if not os.path.isdir(src_root) and root != dst:
+            os.rmdir(root)
+    for root, dirs, names in os.walk(src):
+        dst_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dst_root, exist_ok=True)
+        for name in names:
+            src_path = os.path.join(root, name)
+            dst_path = os.path.join(dst_root, name)
+            if os.path.isfile(dst_path) and not os.path.islink(dst_path) and filecmp.cmp(src_path, dst_path, shallow=False):
+                continue
+            if os.path.lexists(dst_path):
+                os.unlink(dst_path)
+            shutil.copyfile(src_path, dst_path, follow_symlinks=False)
+            if not os.path.islink(src_path):
+                shutil.copymode(src_path, dst_path)
+            changes += 1
+    return changes
+
+
+def _link_entry(src, dst):
+    try:
+        os.symlink(src, dst, target_is_directory=os.path.isdir(src))
+    except OSError:
+        # Creating symbolic links needs a privilege on Windows
+        if os.path.isdir(src):
+            clone_tree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+
+def overlay_tree(src, dst, files):
+    """
+    Make dst a view of src in which some files have other contents: every entry of src is linked (a symbolic link,
+    else a clone, see clone_tree), except the folders leading to the given files, which are created, and these files,
+    which are written with the mode of the file they replace.
+    :param files: dict of path relative to src ("/" separated) to contents
+    """
+    os.makedirs(dst, exist_ok=True)
+    children = {}
+    for path, contents in files.items():
+        head, _, tail = path.partition("/")
+        children.setdefault(head, {})[tail] = contents
+    for name in os.listdir(src):
+        src_path = os.path.join(src, name)
+        dst_path = os.path.join(dst, name)
+        if name not in children:
+            _link_entry(src_path, dst_path)
+        elif "" in children[name]:
+            with open(dst_path, "w", encoding="utf-8") as f:
+                f.write(children[name][""])
+            shutil.copymode(src_path, dst_path)
+        else:
+            overlay_tree(src_path, dst_path, children[name])
+
+
+def file_identity(path):
+    """
+    :return: "real path|mtime|size" of a file, which changes whenever the file is replaced or updated
+    """
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return f"{path}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def clone_tree(src, dst, allow_hardlinks=True, jobs=None):
+    """
+    Copy a folder tree as cheaply as the file system allows: reflinks, else hardlinks, else a multi-threaded copy.
+    Hardlinked files share their data with the source tree, which therefore must never be modified in place:
+    write a new file and rename it over the old one instead.
+    :return: name of the strategy that was used
+    """
+    files = []
+    for root, dirs, names in os.walk(src):
+        dst_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dst_root, exist_ok=True)
+        for name in dirs + names:
+            if os.path.islink(os.path.join(root, name)):
+                # os.walk does not descend into linked folders, recreate links as they are
+                if os.path.lexists(os.path.join(dst_root, name)):
+                    os.unlink(os.path.join(dst_root, name))
+                os.symlink(os.readlink(os.path.join(root, name)), os.path.join(dst_root, name))
+            elif name in names:
+                files.append((os.path.join(root, name), os.path.join(dst_root, name)))
+    if not files:
+        return "copy"
+
+    strategies = []
+    if fcntl is not None and sys.platform.startswith("linux"):
+        strategies.append(("reflink", _reflink_file))
+    if allow_hardlinks:
+        strategies.append(("hardlink", _link_file))
+    for strategy, clone_file in strategies:
+        try:
+            clone_file(*files[0])
+        except OSError:
+            continue
+        for file_src, file_dst in files[1:]:
+            try:
+                clone_file(file_src, file_dst)
+            except OSError:
+                shutil.copy2(file_src, file_dst)
+        return strategy
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for _ in executor.map(lambda file: shutil.copy2(*file), files):
+            pass
+    return "copy"
+
+
+def parse_compiler_launcher_stats(launcher, output):
+    """
+    :param launcher: "ccache" (output of --print-stats: "counter<TAB>value" lines)
+                     or "sccache" (output of --show-stats --stats-format=json)
+    :return: dict of counter name -> value, or None, if the output cannot be parsed
+    """
+    stats = {}
+    if launcher == "ccache":
+        for line in output.splitlines():
+            name, _, value = line.partition("\t")
+            if value.strip().isdigit() and not name.endswith("timestamp"):
+                stats[name] = int(value)
+        return stats or None
+    try:
+        counters = json.loads(output)["stats"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    for name, value in counters.items():
+        if isinstance(value, int):
+            stats[name] = value
+        elif isinstance(value, dict) and isinstance(value.get("counts"), dict):
+            # per language counters, e.g. "cache_hits": {"counts": {"C/C++": 12}}
+            stats[name] = sum(value["counts"].values())
+    return stats
+
+
+class _PatchLogCollector(logging.Handler):
+    """
+    Collects the warnings and errors of patch_ng per thread, so concurrent patches do not mix their messages.
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = collections.defaultdict(list)
+
+    def emit(self, record):
+        self.messages[record.thread].append(record.getMessage())
+
+    def pop(self):
+        return self.messages.pop(threading.get_ident(), [])
+
+
+class PatchPlan(object):
+    """
+    All patches of a version, parsed up front and grouped by the files they touch:
+    patches sharing a file are applied in their conandata order, disjoint groups are applied concurrently.
+    """
+
+    def __init__(self, patches, patches_folder):
+        self.patches = []
+        errors = []
+        for entry in patches:
+            if "patch_file" in entry:
+                name = entry["patch_file"]
+                patchset = patch_ng.fromfile(os.path.join(patches_folder, name))
+            else:
+                name = entry.get("patch_description", "patch_string")
+                patchset = patch_ng.fromstring(entry["patch_string"].encode())
+            if not patchset:
+                errors.append(f"{name}: cannot be parsed")
+                continue
+            self.patches.append((name, entry.get("base_path", ""), patchset))
+        if errors:
+            raise ConanException("Invalid patches:\n  " + "\n  ".join(errors))
+        self.files = [self._touched_files(base_path, patchset) for _, base_path, patchset in self.patches]
+        self.groups = self._group(self.files)
+
+    @staticmethod
+    def _item_paths(item):
+        # patch_ng only strips the a/ and b/ prefixes of git and hg patches itself,
+        # for plain "diff -ru a/... b/..." patches it falls back to it when looking for the files
+        source, target = item.source, item.target
+        if source == b"/dev/null" or target == b"/dev/null" or (source.startswith(b"a/") and target.startswith(b"b/")):
+            source = source[2:] if source.startswith(b"a/") else source
+            target = target[2:] if target.startswith(b"b/") else target
+        return source, target
+
+    @classmethod
+    def _touched_files(cls, base_path, patchset):
+        files = set()
+        for item in patchset.items:
+            for filename in cls._item_paths(item):
+                if filename != b"/dev/null":
+                    files.add(os.path.normpath(os.path.join(base_path, filename.decode("utf-8"))))
+        return files
+
+    @staticmethod
+    def _group(files):
+        """
+        :return: lists of patch indices, each in application order, so that no two lists touch the same file
+        """
+        parent = list(range(len(files)))
+
+        def find(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        owners = {}
+        for index, touched in enumerate(files):
+            for filename in touched:
+                if filename in owners:
+                    parent[find(index)] = find(owners[filename])
+                else:
+                    owners[filename] = index
+        groups = collections.defaultdict(list)
+        for index in range(len(files)):
+            groups[find(index)].append(index)
+        return sorted(groups.values())
+
+    @property
+    def conflicts(self):
+        """
+        :return: dict of file -> names of the patches touching it, for files touched by several patches
+        """
+        touching = collections.defaultdict(list)
+        for (name, _, _), touched in zip(self.patches, self.files):
+            for filename in touched:
+                touching[filename].append(name)
+        return {filename: names for filename, names in touching.items() if len(names) > 1}
+
+    @classmethod
+    def _apply_patchset(cls, patchset, root):
+        # PatchSet.apply(root=...) changes the working directory of the whole process,
+        # so make the paths absolute instead, which is safe to do from several threads
+        root = os.path.abspath(root).encode("utf-8")
+        for item in patchset.items:
+            source, target = cls._item_paths(item)
+            item.source = source if source == b"/dev/null" else os.path.join(root, source)
+            item.target = target if target == b"/dev/null" else os.path.join(root, target)
+        return patchset.apply()
+
+    def apply(self, source_folder, output, jobs=None):
+        """
+        apply every patch; a failing patch stops its group and cancels the groups which did not start yet
+        :raise ConanException: with the messages of every failed patch
+        """
+        collector = _PatchLogCollector()
+        logger = logging.getLogger("patch_ng")
+        logger.addHandler(collector)
+        failures = []
+
+        def apply_group(group):
+            for index in group:
+                name, base_path, patchset = self.patches[index]
+                try:
+                    applied = self._apply_patchset(patchset, os.path.join(source_folder, base_path))
+                except (OSError, ValueError) as e:
+                    collector.pop()
+                    return name, [str(e)]
+                messages = collector.pop()
+                if not applied:
+                    return name, messages
+                output.info(f"Applied patch {name}")
+            return None
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(apply_group, group) for group in self.groups]
+                for future in concurrent.futures.as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    failure = future.result()
+                    if failure:
+                        failures.append(failure)
+                        for pending in futures:
+                            pending.cancel()
+        finally:
+            logger.removeHandler(collector)
+        if failures:
+            report = [f"{name}:\n    " + "\n    ".join(messages or ["failed"]) for name, messages in failures]
+            raise ConanException("Failed to apply patches:\n  " + "\n  ".join(report))
+
+
+_B2_XML_ACTION_RE = re.compile(r"<action\b([^>]*)>(.*?)</action>", re.DOTALL)
+_B2_XML_ATTRIBUTE_RE = re.compile(r'(\w+)="([^"]*)"')
+_B2_XML_ELEMENT_RE = re.compile(r"<(name|source|jam-target|path)>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</\1>", re.DOTALL)
+_B2_GRIST_RE = re.compile(r"^<p([^>]*)>(.*)$")
+_B2_LIBRARY_RE = re.compile(r"(?:^|[/\\])libs[/\\]([^/\\]+)[/\\]")
+
+
+def _b2_grist_path(name):
+    """
+    :return: a b2 target or source name with its "<pdirectory>" grist turned into a path ("<plibs/log>src/core.cpp" ->
+             "libs/log/src/core.cpp")
+    """
+    match = _B2_GRIST_RE.match(name)
+    if not match:
+        return name
+    return f"{match.group(1)}/{match.group(2)}" if match.group(1) else match.group(2)
+
+
+def _parse_b2_time(value):
+    """
+    :return: seconds since the epoch of a b2 timestamp ("2022-05-04 10:11:12.123456789 +0000"), or None
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = re.match(r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(\.\d+)?", value.strip())
+    if not match:
+        return None
+    timestamp = datetime.datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").replace(tzinfo=datetime.timezone.utc)
+    return timestamp.timestamp() + float(match.group(2) or 0)
+
+
+def parse_b2_xml(path):
+    """
+    Read the actions of a b2 --out-xml file. The file is scanned with regular expressions rather than an XML parser,
+    so a file cut short by a failed build, or command output that is not valid XML, still yields every complete action.
+    Each action names its rule in <name>, its output in <path> (<jam-target> holds the gristed target) and its inputs
+    in <source>; directory creation actions have no <name>.
+    :return: list of dicts with the action name, target path, library, sources, status, start, end and cpu seconds
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        contents = f.read()
+    actions = []
+    for match in _B2_XML_ACTION_RE.finditer(contents):
+        attributes = dict(_B2_XML_ATTRIBUTE_RE.findall(match.group(1)))
+        elements = collections.defaultdict(list)
+        for element, value in _B2_XML_ELEMENT_RE.findall(match.group(2)):
+            elements[element].append(value.strip())
+        sources = [_b2_grist_path(source) for source in elements["source"]]
+        target = (elements["path"] or elements["jam-target"] or [""])[0]
+        if not elements["path"]:
+            target = _b2_grist_path(target)
+        library = None
+        for candidate in [target] + sources:
+            library_match = _B2_LIBRARY_RE.search(candidate)
+            if library_match:
+                library = library_match.group(1)
+                break
+        cpu = 0.0
+        for name in ("user", "system"):
+            try:
+                cpu += float(attributes.get(name, 0))
+            except ValueError:
+                pass
+        actions.append({
+            "name": elements["name"][0] if elements["name"] else "",
+            "target": target,
+            "library": library,
+            "sources": sources,
+            "status": attributes.get("status"),
+            "start": _parse_b2_time(attributes.get("start", "")),
+            "end": _parse_b2_time(attributes.get("end", "")),
+            "cpu": cpu,
+        })
+    return actions
+
+
+def b2_timing_report(actions, slowest_count=25):
+    """
+    :return: (timing report, Chrome trace) of the actions returned by parse_b2_xml
+    """
+    def duration(action):
+        if action["start"] is not None and action["end"] is not None:
+            return max(0.0, action["end"] - action["start"])
+        return action["cpu"]
+
+    def kind(action):
+        name = action["name"].lower()
+        if "compile" in name:
+            return "compile"
+        if "link" in name or "archive" in name:
+            return "link"
+        return "other"
+
+    libraries = collections.defaultdict(lambda: {"compile_seconds": 0.0, "link_seconds": 0.0, "other_seconds": 0.0, "actions": 0})
+    for action in actions:
+        library = libraries[action["library"] or "(none)"]
+        library[f"{kind(action)}_seconds"] += duration(action)
+        library["actions"] += 1
+    compiles = sorted((action for action in actions if kind(action) == "compile"), key=duration, reverse=True)
+    starts = [action["start"] for action in actions if action["start"] is not None]
+    ends = [action["end"] for action in actions if action["end"] is not None]
+    report = {
+        "wall_seconds": round(max(ends) - min(starts), 3) if starts and ends else None,
+        "actions": len(actions),
+        "failed_actions": [action["target"] for action in actions if action["status"] not in (None, "0")],
+        "libraries": sorted(({"name": name, **{k: round(v, 3) for k, v in values.items()}} for name, values in libraries.items()),
+                            key=lambda library: library["compile_seconds"] + library["link_seconds"] + library["other_seconds"],
+                            reverse=True),
+        "slowest_translation_units": [{
+            "source": next((source for source in action["sources"] if not source.endswith((".h", ".hpp"))), action["target"]),
+            "library": action["library"],
+            "seconds": round(duration(action), 3),
+        } for action in compiles[:slowest_count]],
+    }
+
+    # Chrome trace: one "thread" per concurrently running action, as b2 does not tell which job ran it
+    events = []
+    lanes = []
+    origin = min(starts) if starts else 0.0
+    for action in sorted((action for action in actions if action["start"] is not None and action["end"] is not None),
+                         key=lambda action: action["start"]):
+        lane = next((i for i, free_at in enumerate(lanes) if free_at <= action["start"]), len(lanes))
+        if lane == len(lanes):
+            lanes.append(action["end"])
+        else:
+            lanes[lane] = action["end"]
+        events.append({
+            "name": os.path.basename(action["target"]) or action["name"],
+            "cat": f"{action['library'] or '(none)'},{kind(action)}",
+            "ph": "X",
+            "ts": int((action["start"] - origin) * 1e6),
+            "dur": int(duration(action) * 1e6),
+            "pid": 1,
+            "tid": lane,
+            "args": {"action": action["name"], "target": action["target"], "status": action["status"]},
+        })
+    return report, {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def children_peak_memory_mib():
+    """
+    :return: peak resident memory of the largest child process waited for so far, in MiB (POSIX only)
+    """
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return maxrss // (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def available_memory_mib():
+    """
+    :return: memory available to new processes in MiB, or None if it cannot be determined
+    """
+    if psutil is not None:
+        return psutil.virtual_memory().available // (1024 * 1024)
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+# Libraries whose build/Jamfile.v2 lists its sources as "SOURCES = a b c ;" used as "$(SOURCES).cpp", which
+# unity_build compiles as one translation unit. The listed sources stay separate translation units: they define
+# macros or file scope helpers that clash with the other sources of the library.
+UNITY_BUILD_EXCLUDES = {
+    "filesystem": ["directory", "operations", "unique_path", "utf8_codecvt_facet", "windows_file_codecvt"],
+    "program_options": ["utf8_codecvt_facet", "winmain"],
+    "serialization": ["basic_xml_grammar", "utf8_codecvt_facet", "xml_grammar", "xml_wgrammar"],
+}
+
+# b2 toolsets whose compiler takes GCC style options (-fdebug-prefix-map, ...)
+GCC_COMPATIBLE_TOOLSETS = {"gcc", "darwin", "clang", "clang-linux", "clang-darwin", "emscripten"}
+
+# Counters of hits and misses in the statistics of the compiler caches, see parse_compiler_launcher_stats
+COMPILER_LAUNCHER_HIT_MISS_COUNTERS = {
+    "ccache": (("direct_cache_hit", "preprocessed_cache_hit"), ("cache_miss",)),
+    "sccache": (("cache_hits",), ("cache_misses",)),
+}
+
+# A library build of library_workers is retried once when its output shows a transient cause (a compiler killed
+# by the OOM killer, a busy or unavailable resource); compile errors fail the same way again and are not retried
+B2_LIBRARY_ATTEMPTS = 2
+B2_TRANSIENT_FAILURE_RE = re.compile(
+    r"Killed signal terminated program|internal compiler error: Killed|virtual memory exhausted|"
+    r"[Oo]ut of memory|Cannot allocate memory|Resource temporarily unavailable|Text file busy")
+
+# Peak memory of one compiler process in MiB, until calibrated by a previous build (see memory_aware_jobs)
+HEAVY_LIBRARY_MEMORY_ESTIMATES = {
+    "log": 2560,
+    "wave": 2048,
+    "math": 1536,
+    "locale": 1024,
+}
+LIGHT_LIBRARY_MEMORY_ESTIMATE = 512
+
+# Runs a command and writes the peak resident memory of its largest (sub)process, in MiB, to a file.
+# Being a process of its own, its RUSAGE_CHILDREN only covers the command.
+RUSAGE_WRAPPER_SCRIPT = """\
+import resource
+import subprocess
+import sys
+
+returncode = subprocess.call(sys.argv[2:])
+maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+with open(sys.argv[1], "w") as f:
+    f.write(str(maxrss // (1024 * 1024 if sys.platform == "darwin" else 1024)))
+sys.exit(returncode)
+"""
+
+
+# Dumps everything the recipe needs to know about a python interpreter in a single run.
+# Must stay compatible with python 2.7, as the interpreter is not necessarily the one running conan.
+PYTHON_PROBE_SCRIPT = """\
+from __future__ import print_function
+import json
+import sys
+import sysconfig
+import warnings
+
+warnings.simplefilter("ignore")
+
+du_vars = {}
+python_inc = None
+try:
+    import distutils.sysconfig as du_sysconfig
+    du_vars = du_sysconfig.get_config_vars()
+    python_inc = du_sysconfig.get_python_inc()
+except Exception:
+    pass
+
+print(json.dumps({
+    "version": "{}.{}".format(sys.version_info[0], sys.version_info[1]),
+    "abiflags": getattr(sys, "abiflags", ""),
+    "paths": sysconfig.get_paths(),
+    "sc_vars": sysconfig.get_config_vars(),
+    "du_vars": du_vars,
+    "python_inc": python_inc,
+}, default=str))
+"""
+
 class BoostConan(ConanFile):
     name = "boost"
     settings = "os", "arch", "compiler", "build_type"
@@ -174,7 +921,14 @@ class BoostConan(ConanFile):
         "python_buildid": "ANY",
         "system_use_utf8": [True, False],
         "no_rtti": [True, False],
-        "no_exceptions": [True, False]
+        "no_exceptions": [True, False],
+        "compiler_launcher": "ANY",  # ccache, sccache or a custom wrapper put in front of the compiler
+        "targeted_build": [True, False],  # only stage the requested libraries, headers are copied by the recipe
+        "build_variants": "ANY",  # extra variants built in the same b2 run, e.g. "static,shared" or "debug,release"
+        "incremental": [True, False],  # keep bin.v2 between builds while flags, user-config.jam and toolchain are unchanged
+        "memory_aware_jobs": [True, False],  # cap b2 -j by the available memory, build memory hungry libraries separately
+        "library_workers": "ANY",  # build each library with a b2 run of its own, this many at the same time
+        "unity_build": [True, False],  # compile the sources of some libraries as one translation unit (see UNITY_BUILD_EXCLUDES)
     }
     options.update({f"without_{_name}": [True, False] for _name in CONFIGURE_OPTIONS})
 
@@ -215,6 +969,13 @@ class BoostConan(ConanFile):
         "buildid": None,
         "python_buildid": None,
         "system_use_utf8": False,
+        "compiler_launcher": "None",
+        "targeted_build": False,
+        "build_variants": "None",
+        "incremental": False,
+        "memory_aware_jobs": False,
+        "library_workers": "None",
+        "unity_build": False,
     }
     default_options.update({f"without_{_name}": False for _name in CONFIGURE_OPTIONS})
     default_options.update({f"without_{_name}": True for _name in disabled_lib_list})
@@ -222,6 +983,9 @@ class BoostConan(ConanFile):
     short_paths = True
     no_copy_source = True
     _cached_dependencies = None
+    _cached_dependency_graph = None
+    _cached_python_info = None
+    _cached_toolchain = None
 
     def export_sources(self):
         for patch in self.conan_data.get("patches", {}).get(self.version, []):
@@ -229,6 +993,8 @@ class BoostConan(ConanFile):
 
     def export(self):
         self.copy(self._dependency_filename, src="dependencies", dst="dependencies")
+        self.copy(self._dependency_index_filename, src="dependencies", dst="dependencies")
+        self._check_patch_verdict(self.recipe_folder)
 
     @property
     def _min_compiler_version_default_cxx11(self):
@@ -255,41 +1021,38 @@ class BoostConan(ConanFile):
     def _dependency_filename(self):
         return f"dependencies-{self.version}.yml"
 
+    @property
+    def _dependency_index_filename(self):
+        return f"dependencies-{self.version}.json"
+
+    def _load_dependencies(self):
+        dependencies_filepath = os.path.join(self.recipe_folder, "dependencies", self._dependency_filename)
+        if not os.path.isfile(dependencies_filepath):
+            raise ConanException(f"Cannot find {dependencies_filepath}")
+        index_filepath = os.path.join(self.recipe_folder, "dependencies", self._dependency_index_filename)
+        index_mtime = os.stat(index_filepath).st_mtime_ns if os.path.isfile(index_filepath) else None
+        self._cached_dependencies, self._cached_dependency_graph, stale_index = load_dependencies(
+            dependencies_filepath, os.stat(dependencies_filepath).st_mtime_ns, index_filepath, index_mtime)
+        if stale_index:
+            self.output.warn(f"{self._dependency_index_filename} is stale, re-run rebuild-dependencies.py -I")
+
     @property
     def _dependencies(self):
         if self._cached_dependencies is None:
-            dependencies_filepath = os.path.join(self.recipe_folder, "dependencies", self._dependency_filename)
-            if not os.path.isfile(dependencies_filepath):
-                raise ConanException(f"Cannot find {dependencies_filepath}")
-            with open(dependencies_filepath, encoding='utf-8') as f:
-                self._cached_dependencies = yaml.safe_load(f)
+            self._load_dependencies()
         return self._cached_dependencies
 
+    @property
+    def _dependency_graph(self):
+        if self._cached_dependency_graph is None:
+            self._load_dependencies()
+        return self._cached_dependency_graph
+
     def _all_dependent_modules(self, name):
-        dependencies = {name}
-        while True:
-            new_dependencies = set()
-            for dependency in dependencies:
-                new_dependencies.update(set(self._dependencies["dependencies"][dependency]))
-                new_dependencies.update(dependencies)
-            if len(new_dependencies) > len(dependencies):
-                dependencies = new_dependencies
-            else:
-                break
-        return dependencies
+        return self._dependency_graph.all_dependent_modules(name)
 
     def _all_super_modules(self, name):
-        dependencies = {name}
-        while True:
-            new_dependencies = set(dependencies)
-            for module in self._dependencies["dependencies"]:
-                if dependencies.intersection(set(self._dependencies["dependencies"][module])):
-                    new_dependencies.add(module)
-            if len(new_dependencies) > len(dependencies):
-                dependencies = new_dependencies
-            else:
-                break
-        return dependencies
+        return self._dependency_graph.all_super_modules(name)
 
     @property
     def _source_subfolder(self):
@@ -320,6 +1083,18 @@ class BoostConan(ConanFile):
         exe = self.options.python_executable if self.options.python_executable else sys.executable
         return str(exe).replace("\\", "/")
 
+    @property
+    def _user_cache_folder(self):
+        """
+        folder where the recipe keeps data between conan invocations
+        :return: value of CONAN_BOOST_CACHE_DIR, or a folder in the conan user home
+        """
+        folder = os.environ.get("CONAN_BOOST_CACHE_DIR")
+        if not folder:
+            user_home = os.environ.get("CONAN_USER_HOME", os.path.expanduser("~"))
+            folder = os.path.join(user_home, ".conan", "boost")
+        return folder
+
     @property
     def _is_windows_platform(self):
         return self.settings.os in ["Windows", "WindowsStore", "WindowsCE"]
@@ -439,6 +1214,9 @@ class BoostConan(ConanFile):
         if self.options.header_only:
             del self.options.shared
             del self.options.fPIC
+            del self.options.build_variants
+            del self.options.library_workers
+            del self.options.unity_build
         elif self.options.shared:
             del self.options.fPIC
 
@@ -495,6 +1273,17 @@ class BoostConan(ConanFile):
                 "Boost.Locale library needs either iconv or ICU library to be built on non windows platforms"
             )
 
+        if not self.options.header_only:
+            _, variants = self._build_variants
+            if len(variants) > 1 and self.options.layout == "system":
+                raise ConanInvalidConfiguration("build_variants with debug and release requires layout=tagged or layout=versioned, "
+                                                "the system layout gives both the same library names")
+            if self.options.library_workers:
+                if not str(self.options.library_workers).isdigit() or int(str(self.options.library_workers)) < 1:
+                    raise ConanInvalidConfiguration("library_workers must be a positive number")
+                if self.options.memory_aware_jobs:
+                    raise ConanInvalidConfiguration("library_workers and memory_aware_jobs cannot be used together")
+
         if self._stacktrace_addr2line_available:
             if not os.path.isabs(str(self.options.addr2line_location)):
                 raise ConanInvalidConfiguration("addr2line_location must be an absolute path to addr2line")
@@ -630,6 +1419,12 @@ class BoostConan(ConanFile):
             del self.info.options.debug_level
             del self.info.options.filesystem_version
             del self.info.options.pch
+            del self.info.options.compiler_launcher
+            del self.info.options.targeted_build
+            del self.info.options.incremental
+            del self.info.options.memory_aware_jobs
+            del self.info.options.library_workers
+            del self.info.options.unity_build
             del self.info.options.python_executable  # PATH to the interpreter is not important, only version matters
             if self.options.without_python:
                 del self.info.options.python_version
@@ -641,34 +1436,236 @@ class BoostConan(ConanFile):
             self.build_requires("b2/4.9.2")
 
     def source(self):
-        get(self, **self.conan_data["sources"][self.version],
-                  destination=self._source_subfolder, strip_root=True)
-        apply_conandata_patches(self)
+        cached_source = self._source_cache_folder
+        if cached_source and os.path.isdir(cached_source):
+            # Never hardlink: build() modifies files of the source folder
+            strategy = clone_tree(cached_source, self._source_subfolder, allow_hardlinks=False)
+            self.output.info(f"Using cached source tree {cached_source} ({strategy})")
+            return
+
+        self._check_patch_verdict(self.export_sources_folder)
+        self._get_sources()
+        self._apply_patches()
+
+        if cached_source:
+            self._store_in_cache(self._source_subfolder, cached_source)
+
+    def _get_sources(self):
+        # lbzip2 decompresses a regular bzip2 stream on all cores; pbzip2 only does so for archives it created,
+        # but still moves decompression off the extracting process
+        bzip2 = tools.which("lbzip2") or tools.which("pbzip2")
+        if not bzip2:
+            get(self, **self.conan_data["sources"][self.version],
+                      destination=self._source_subfolder, strip_root=True)
+            return
+        urls = self.conan_data["sources"][self.version]["url"]
+        archive = os.path.basename(urls[0] if isinstance(urls, list) else urls)
+        download(self, urls, archive, sha256=self.conan_data["sources"][self.version]["sha256"])
+        self.output.info(f"Extracting {archive} with {bzip2}")
+        try:
+            try:
+                extract_tar_from_command([bzip2, "-dc", archive], self._source_subfolder, strip_root=True)
+            except ConanException as e:
+                self.output.warn(f"{e}\nExtracting {archive} with python instead")
+                if os.path.isdir(self._source_subfolder):
+                    shutil.rmtree(self._source_subfolder)
+                with tarfile.open(archive, "r|bz2") as tar:
+                    extract_tar_members(tar, self._source_subfolder, strip_root=True)
+        finally:
+            os.unlink(archive)
+
+    @property
+    def _patches(self):
+        return self.conan_data.get("patches", {}).get(self.version, [])
+
+    def _apply_patches(self):
+        key = self._source_cache_key
+        try:
+            plan = PatchPlan(self._patches, self.export_sources_folder)
+            self.output.info(f"Applying {len(plan.patches)} patches in {len(plan.groups)} independent groups")
+            plan.apply(self.source_folder, self.output, jobs=build_jobs(self))
+        except ConanException as e:
+            self._save_patch_verdict(key, str(e))
+            raise
+        self._save_patch_verdict(key, None)
+
+    @property
+    def _patch_verdicts_file(self):
+        return os.path.join(self._user_cache_folder, "patches.json")
+
+    def _check_patch_verdict(self, patches_folder):
+        """
+        fail early if the patches are already known not to apply to the sources, without downloading them
+        """
+        if self.version not in (self.conan_data or {}).get("sources", {}):
+            # Nothing to check (e.g. exporting a version which conandata.yml does not list)
+            return
+        verdict = self._load_user_cache(self._patch_verdicts_file).get(self._source_key(patches_folder))
+        if verdict is None:
+            return
+        if verdict["error"]:
+            raise ConanException(f"patches of boost/{self.version} are known not to apply:\n{verdict['error']}")
+        self.output.info(f"patches of boost/{self.version} are known to apply cleanly")
+
+    def _save_patch_verdict(self, key, error):
+        verdicts = self._load_user_cache(self._patch_verdicts_file)
+        verdicts.pop(key, None)
+        verdicts[key] = {"version": self.version, "error": error}
+        # Keep the most recent verdicts only, so the cache does not grow forever
+        verdicts = dict(list(verdicts.items())[-64:])
+        self._save_user_cache(self._patch_verdicts_file, verdicts)
+
+    @property
+    def _source_cache_key(self):
+        """
+        :return: hash of everything the patched source tree is made of: the archive and the patches
+        """
+        return self._source_key(self.export_sources_folder)
+
+    def _source_key(self, patches_folder):
+        patches = []
+        for patch in self._patches:
+            if "patch_file" in patch:
+                with open(os.path.join(patches_folder, patch["patch_file"]), "rb") as f:
+                    patches.append([patch["patch_file"], patch.get("base_path", ""), hashlib.sha256(f.read()).hexdigest()])
+            else:
+                patches.append(["", patch.get("base_path", ""), hashlib.sha256(patch["patch_string"].encode()).hexdigest()])
+        key = {
+            "format": SOURCE_CACHE_FORMAT,
+            "sha256": self.conan_data["sources"][self.version]["sha256"],
+            "patches": patches,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def _source_cache_folder(self):
+        """
+        :return: folder of the patched source tree in the source cache, or None if CONAN_BOOST_SOURCE_CACHE is not enabled
+        """
+        if not tools.get_env("CONAN_BOOST_SOURCE_CACHE", False):
+            return None
+        return os.path.join(self._user_cache_folder, "sources", f"{self.version}-{self._source_cache_key}")
+
+    def _store_in_cache(self, folder, cached_folder):
+        self.output.info(f"Storing {folder} in {cached_folder}")
+        os.makedirs(os.path.dirname(cached_folder), exist_ok=True)
+        tmp_folder = tempfile.mkdtemp(dir=os.path.dirname(cached_folder), prefix=".tmp-")
+        try:
+            clone_tree(folder, tmp_folder, allow_hardlinks=False)
+            os.rename(tmp_folder, cached_folder)
+        except OSError as e:
+            # Most likely another conan process stored the same tree in the meantime
+            self.output.warn(f"couldn't store {folder} in the cache: {e}")
+            shutil.rmtree(tmp_folder, ignore_errors=True)
 
     ##################### BUILDING METHODS ###########################
 
-    def _run_python_script(self, script):
+    def _run_python_script(self, script, quiet=False):
         """
-        execute python one-liner script and return its output
+        execute python script and return its output
         :param script: string containing python script to be executed
+        :param quiet: do not print the output of the script
         :return: output of the python script execution, or None, if script has failed
         """
         output = StringIO()
-        command = f'"{self._python_executable}" -c "{script}"'
-        self.output.info(f"running {command}")
+        fd, script_path = tempfile.mkstemp(suffix=".py", prefix="conan_boost_")
         try:
-            self.run(command=command, output=output)
-        except ConanException:
-            self.output.info("(failed)")
-            return None
+            with os.fdopen(fd, "w") as f:
+                f.write(script)
+            command = f'"{self._python_executable}" "{script_path}"'
+            self.output.info(f"running {command}")
+            try:
+                self.run(command=command, output=output)
+            except ConanException:
+                self.output.info("(failed)")
+                return None
+        finally:
+            os.unlink(script_path)
         output = output.getvalue()
         # Conan is broken when run_to_output = True
         if "\n-----------------\n" in output:
             output = output.split("\n-----------------\n", 1)[1]
         output = output.strip()
-        self.output.info(output)
+        if not quiet:
+            self.output.info(output)
         return output if output != "None" else None
 
+    @property
+    def _python_info(self):
+        """
+        query the python interpreter once for everything the recipe needs to know about it
+        :return: dict with the version, abiflags, sysconfig paths and variables, and distutils fallbacks,
+                 all of them None or empty, if the interpreter has failed
+        """
+        if self._cached_python_info is None:
+            cache_key = self._python_info_cache_key
+            cached_infos = self._load_user_cache(self._python_info_cache_file)
+            if cache_key and cache_key in cached_infos:
+                self.output.info(f"using cached information of python interpreter {self._python_executable}")
+                self._cached_python_info = cached_infos[cache_key]
+            else:
+                output = self._run_python_script(PYTHON_PROBE_SCRIPT, quiet=True)
+                try:
+                    # The probe prints its result as the last line, anything before is noise from the interpreter
+                    self._cached_python_info = json.loads(output.splitlines()[-1]) if output else None
+                except ValueError:
+                    self._cached_python_info = None
+                if not self._cached_python_info:
+                    # Like the former per-value queries: every value is unknown (None), and nothing is cached
+                    self.output.warn(f"couldn't query the python interpreter {self._python_executable}")
+                    self._cached_python_info = {"version": None, "abiflags": None, "python_inc": None,
+                                                "paths": {}, "sc_vars": {}, "du_vars": {}}
+                elif cache_key:
+                    cached_infos[cache_key] = self._cached_python_info
+                    self._save_python_info_cache(cached_infos)
+        return self._cached_python_info
+
+    @property
+    def _python_info_cache_key(self):
+        """
+        identity of the python interpreter: its real path, modification time and size
+        :return: cache key of the interpreter, or None, if the interpreter cannot be found
+        """
+        executable = self._python_executable
+        if not os.path.isfile(executable):
+            executable = tools.which(executable)
+            if not executable:
+                return None
+        return file_identity(executable)
+
+    @property
+    def _python_info_cache_file(self):
+        return os.path.join(self._user_cache_folder, "python-info.json")
+
+    def _save_python_info_cache(self, cached_infos):
+        # Drop interpreters which do not exist anymore, so the cache does not grow forever
+        cached_infos = {k: v for k, v in cached_infos.items() if os.path.isfile(k.rsplit("|", 2)[0])}
+        self._save_user_cache(self._python_info_cache_file, cached_infos)
+
+    @staticmethod
+    def _load_user_cache(filename):
+        try:
+            with open(filename, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_user_cache(self, filename, data):
+        try:
+            os.makedirs(self._user_cache_folder, exist_ok=True)
+            # Write + rename, so concurrent conan processes never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self._user_cache_folder, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, filename)
+        except OSError as e:
+            self.output.warn(f"couldn't save {filename}: {e}")
+
+    @staticmethod
+    def _python_info_value(value):
+        # Keep returning strings, as the former one-liner scripts did
+        return None if value is None else str(value)
+
     def _get_python_path(self, name):
         """
         obtain path entry for the python installation
@@ -677,9 +1674,7 @@ class BoostConan(ConanFile):
         """
         # https://docs.python.org/3/library/sysconfig.html
         # https://docs.python.org/2.7/library/sysconfig.html
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import sysconfig; "
-                                       f"print(sysconfig.get_path('{name}'))")
+        return self._python_info_value(self._python_info["paths"].get(name))
 
     def _get_python_sc_var(self, name):
         """
@@ -687,9 +1682,7 @@ class BoostConan(ConanFile):
         :param name: name of variable to be queried (such as LIBRARY or LDLIBRARY)
         :return: value of python sysconfig variable
         """
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import sysconfig; "
-                                       f"print(sysconfig.get_config_var('{name}'))")
+        return self._python_info_value(self._python_info["sc_vars"].get(name))
 
     def _get_python_du_var(self, name):
         """
@@ -698,9 +1691,7 @@ class BoostConan(ConanFile):
         :param name: name of variable to be queried (such as LIBRARY or LDLIBRARY)
         :return: value of python sysconfig variable
         """
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import distutils.sysconfig as du_sysconfig; "
-                                       f"print(du_sysconfig.get_config_var('{name}'))")
+        return self._python_info_value(self._python_info["du_vars"].get(name))
 
     def _get_python_var(self, name):
         """
@@ -723,9 +1714,7 @@ class BoostConan(ConanFile):
         obtain version of python interpreter
         :return: python interpreter version, in format major.minor
         """
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import sys; "
-                                       "print('{}.{}'.format(sys.version_info[0], sys.version_info[1]))")
+        return self._python_info["version"]
 
 
     @property
@@ -738,12 +1727,10 @@ class BoostConan(ConanFile):
     @property
     def _python_inc(self):
         """
-        obtain the result of the "sysconfig.get_python_inc()" call
-        :return: result of the "sysconfig.get_python_inc()" execution
+        obtain the result of the "distutils.sysconfig.get_python_inc()" call
+        :return: result of the "distutils.sysconfig.get_python_inc()" execution
         """
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import sysconfig; "
-                                       "print(sysconfig.get_python_inc())")
+        return self._python_info_value(self._python_info["python_inc"])
 
     @property
     def _python_abiflags(self):
@@ -751,9 +1738,7 @@ class BoostConan(ConanFile):
         obtain python ABI flags, see https://www.python.org/dev/peps/pep-3149/ for the details
         :return: the value of python ABI flags
         """
-        return self._run_python_script("from __future__ import print_function; "
-                                       "import sys; "
-                                       "print(getattr(sys, 'abiflags', ''))")
+        return self._python_info["abiflags"]
 
     @property
     def _python_includes(self):
@@ -846,6 +1831,9 @@ class BoostConan(ConanFile):
 
     @property
     def _b2_exe(self):
+        return self._toolchain["b2"]
+
+    def _detect_b2_exe(self):
         b2_exe = "b2.exe" if tools.os_info.is_windows else "b2"
         b2_path = tools.which(b2_exe)
         if b2_path is not None and len(b2_path):
@@ -869,7 +1857,80 @@ class BoostConan(ConanFile):
     def _boost_build_dir(self):
         return os.path.join(self.source_folder, self._source_subfolder, "tools", "build")
 
+    @property
+    def _bcp_cache_folder(self):
+        """
+        :return: folder of the bcp executables and namespaced trees, or None if CONAN_BOOST_BCP_CACHE is not enabled
+        """
+        if not tools.get_env("CONAN_BOOST_BCP_CACHE", False):
+            return None
+        return os.path.join(self._user_cache_folder, "bcp")
+
+    @property
+    def _bcp_tree_cache_key(self):
+        """
+        :return: hash of what the namespaced tree is made of: the patched sources, the rewrites of build() and the bcp options
+        """
+        key = {
+            "source": self._source_key(self.source_folder),
+            "rewrites": self._source_rewrites,
+            "namespace": str(self.options.namespace),
+            "namespace_alias": bool(self.options.namespace_alias),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def _bcp_exe_cache_key(self):
+        key = {
+            "source": self._source_key(self.source_folder),
+            "toolchain": self._toolchain_fingerprint,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def _prepare_bcp_tree(self):
+        bcp_dir = os.path.join(self.source_folder, self._bcp_dir)
+        key = self._bcp_tree_cache_key
+        key_file = f"{bcp_dir}.key"
+        if self.options.incremental and os.path.isdir(bcp_dir):
+            if os.path.isfile(key_file) and load(self, key_file) == key:
+                self.output.info("incremental build: the namespaced tree is up to date")
+                return
+            # Make the new tree next to the old one, then only touch the files that changed, so b2 keeps the rest of bin.v2
+            destination = f"{bcp_dir}.new"
+        else:
+            destination = bcp_dir
+        if os.path.isdir(destination):
+            shutil.rmtree(destination)
+
+        cached_tree = None
+        if self._bcp_cache_folder:
+            cached_tree = os.path.join(self._bcp_cache_folder, f"tree-{key}")
+        if cached_tree and os.path.isdir(cached_tree):
+            # Never hardlink: the cached tree is shared by every configuration
+            strategy = clone_tree(cached_tree, destination, allow_hardlinks=False)
+            self.output.info(f"Using cached namespaced tree {cached_tree} ({strategy})")
+        else:
+            self._build_bcp()
+            self._run_bcp(destination)
+            if cached_tree:
+                self._store_in_cache(destination, cached_tree)
+
+        if destination != bcp_dir:
+            changes = sync_tree(destination, bcp_dir)
+            shutil.rmtree(destination)
+            self.output.info(f"incremental build: {changes} files of the namespaced tree changed")
+        save(self, key_file, key)
+
     def _build_bcp(self):
+        cached_bcp = None
+        if self._bcp_cache_folder:
+            cached_bcp = os.path.join(self._bcp_cache_folder, f"exe-{self._bcp_exe_cache_key}", os.path.basename(self._bcp_exe))
+            if os.path.isfile(cached_bcp):
+                self.output.info(f"Using cached bcp executable {cached_bcp}")
+                mkdir(self, os.path.dirname(self._bcp_exe))
+                shutil.copy2(cached_bcp, self._bcp_exe)
+                return
+
         folder = os.path.join(self.source_folder, self._source_subfolder, "tools", "bcp")
         with tools.vcvars(self.settings, only_diff=False) if self._is_msvc or self._is_clang_cl else tools.no_op(): # https://github.com/conan-io/conan/issues/6577
             with chdir(self, folder):
@@ -880,10 +1941,16 @@ class BoostConan(ConanFile):
                     self.output.warn(command)
                     self.run(command, run_environment=True)
 
-    def _run_bcp(self):
+        if cached_bcp:
+            os.makedirs(os.path.dirname(cached_bcp), exist_ok=True)
+            tmp_path = f"{cached_bcp}.{os.getpid()}.tmp"
+            shutil.copy2(self._bcp_exe, tmp_path)
+            os.replace(tmp_path, cached_bcp)
+
+    def _run_bcp(self, destination):
         with tools.vcvars(self.settings, only_diff=False) if self._is_msvc or self._is_clang_cl else tools.no_op(): # https://github.com/conan-io/conan/issues/6577
             with chdir(self, self.source_folder):
-                mkdir(self, self._bcp_dir)
+                mkdir(self, destination)
                 namespace = f"--namespace={self.options.namespace}"
                 alias = "--namespace-alias" if self.options.namespace_alias else ""
                 boostdir = f"--boost={self._source_subfolder}"
@@ -894,69 +1961,525 @@ class BoostConan(ConanFile):
                 for d in os.listdir(os.path.join(self._source_subfolder, "libs")):
                     if os.path.isdir(os.path.join(self._source_subfolder, "libs", d)):
                         libraries.add(d)
-                libraries = " ".join(libraries)
-                command = f"{self._bcp_exe} {namespace} {alias} {boostdir} {libraries} {self._bcp_dir}"
+                # A single run: the header closures of the libraries overlap almost entirely, bcp runs on subsets of
+                # them would scan and rewrite the same headers again and again
+                libraries = " ".join(sorted(libraries))
+                command = f"{self._bcp_exe} {namespace} {alias} {boostdir} {libraries} {destination}"
                 self.output.warn(command)
                 self.run(command)
 
-    def build(self):
+    @property
+    def _unity_root(self):
+        return os.path.join(self.build_folder, "unity-root")
+
+    def _configure_unity_build(self, boost_dir):
+        """
+        generate a jumbo source per source list of the UNITY_BUILD_EXCLUDES libraries in the build folder, and a view
+        of the boost tree there (see overlay_tree) in which their Jamfile compiles it instead of the sources it includes;
+        the source folder is shared by all configurations (no_copy_source) and stays untouched
+        :return: root of the boost tree to run b2 in
+        """
+        source_root = os.path.join(self.source_folder, boost_dir)
+        jamfiles = {}
+        for library in sorted(set(UNITY_BUILD_EXCLUDES).intersection(self._built_modules)):
+            library_dir = os.path.join(source_root, "libs", library)
+            jamfile = os.path.join(library_dir, "build", "Jamfile.v2")
+            with open(jamfile, encoding="utf-8") as f:
+                original = f.read()
+            contents = original
+            for variable, names in re.findall(r"^\s*(?:local\s+)?(\w*SOURCES)\s*=\s*([^;]*);", original, re.MULTILINE):
+                if f"$({variable}).cpp" not in original:
+                    continue
+                names = names.split()
+                unity = [name for name in names if name not in UNITY_BUILD_EXCLUDES[library]
+                         and os.path.isfile(os.path.join(library_dir, "src", f"{name}.cpp"))]
+                if len(unity) < 2:
+                    continue
+                separate = [name for name in names if name not in unity]
+                unity_source = os.path.join(self.build_folder, "unity", library, f"{library}_unity_{variable.lower()}.cpp").replace("\\", "/")
+                src_dir = os.path.join(library_dir, "src").replace("\\", "/")
+                unity_contents = f"// Generated by the unity_build option of the boost recipe, sources of {library}/build/Jamfile.v2 {variable}\n"
+                unity_contents += "".join(f'#include "{src_dir}/{name}.cpp"\n' for name in unity)
+                self._save_if_changed(unity_source, unity_contents)
+                contents = re.sub(rf"^(\s*(?:local\s+)?{variable}\s*=)\s*[^;]*;",
+                                  lambda match: f"{match.group(1)} {' '.join(separate)} ;", contents, count=1, flags=re.MULTILINE)
+                contents = contents.replace(f"$({variable}).cpp", f"$({variable}).cpp {unity_source}")
+                self.output.info(f"unity build of {library}: {len(unity)} sources in {unity_source}, "
+                                 f"{len(separate)} compiled separately")
+            if contents == original:
+                self.output.warn(f"unity build of {library}: no source list found in {jamfile}, building it as usual")
+                continue
+            jamfiles[f"libs/{library}/build/Jamfile.v2"] = contents
+
+        if os.path.isdir(self._unity_root):
+            shutil.rmtree(self._unity_root)
+        overlay_tree(source_root, self._unity_root, jamfiles)
+        return self._unity_root
+
+    def _save_if_changed(self, path, contents):
+        # An unchanged file keeps its mtime, so b2 does not rebuild it
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == contents:
+                    return
+        except OSError:
+            pass
+        save(self, path, contents)
+
+    @property
+    def _source_rewrites(self):
+        """
+        edits of the source tree needed by build(), in the order they apply
+        :return: list of (path relative to the boost source folder, search, replace, strict)
+        """
+        stacktrace_impls = os.path.join("boost", "stacktrace", "detail", "libbacktrace_impls.hpp")
+        gcc_jam = os.path.join("tools", "build", "src", "tools", "gcc.jam")
+        rewrites = []
         if cross_building(self, skip_x64_x86=True):
             # When cross building, do not attempt to run the test-executable (assume they work)
-            replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "libs", "stacktrace", "build", "Jamfile.v2"),
-                                  "$(>) > $(<)",
-                                  "echo \"\" > $(<)", strict=False)
+            rewrites.append((os.path.join("libs", "stacktrace", "build", "Jamfile.v2"),
+                             "$(>) > $(<)",
+                             "echo \"\" > $(<)", False))
         # Older clang releases require a thread_local variable to be initialized by a constant value
-        replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "boost", "stacktrace", "detail", "libbacktrace_impls.hpp"),
-                              "/* thread_local */", "thread_local", strict=False)
-        replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "boost", "stacktrace", "detail", "libbacktrace_impls.hpp"),
-                              "/* static __thread */", "static __thread", strict=False)
+        rewrites.append((stacktrace_impls, "/* thread_local */", "thread_local", False))
+        rewrites.append((stacktrace_impls, "/* static __thread */", "static __thread", False))
         if self.settings.compiler == "apple-clang" or (self.settings.compiler == "clang" and Version(self.settings.compiler.version) < 6):
-            replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "boost", "stacktrace", "detail", "libbacktrace_impls.hpp"),
-                                  "thread_local", "/* thread_local */")
-            replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "boost", "stacktrace", "detail", "libbacktrace_impls.hpp"),
-                                  "static __thread", "/* static __thread */")
-        replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "tools", "build", "src", "tools", "gcc.jam"),
-                              "local generic-os = [ set.difference $(all-os) : aix darwin vxworks solaris osf hpux ] ;",
-                              "local generic-os = [ set.difference $(all-os) : aix darwin vxworks solaris osf hpux iphone appletv ] ;",
-                              strict=False)
-        replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "tools", "build", "src", "tools", "gcc.jam"),
-                              "local no-threading = android beos haiku sgi darwin vxworks ;",
-                              "local no-threading = android beos haiku sgi darwin vxworks iphone appletv ;",
-                              strict=False)
-        replace_in_file(self, os.path.join(self.source_folder, self._source_subfolder, "libs", "fiber", "build", "Jamfile.v2"),
-                              "    <conditional>@numa",
-                              "    <link>shared:<library>.//boost_fiber : <conditional>@numa",
-                              strict=False)
+            rewrites.append((stacktrace_impls, "thread_local", "/* thread_local */", True))
+            rewrites.append((stacktrace_impls, "static __thread", "/* static __thread */", True))
+        rewrites.append((gcc_jam,
+                         "local generic-os = [ set.difference $(all-os) : aix darwin vxworks solaris osf hpux ] ;",
+                         "local generic-os = [ set.difference $(all-os) : aix darwin vxworks solaris osf hpux iphone appletv ] ;",
+                         False))
+        rewrites.append((gcc_jam,
+                         "local no-threading = android beos haiku sgi darwin vxworks ;",
+                         "local no-threading = android beos haiku sgi darwin vxworks iphone appletv ;",
+                         False))
+        rewrites.append((os.path.join("libs", "fiber", "build", "Jamfile.v2"),
+                         "    <conditional>@numa",
+                         "    <link>shared:<library>.//boost_fiber : <conditional>@numa",
+                         False))
+        return rewrites
+
+    def _rewrite_source_files(self, rewrites):
+        """
+        apply rewrites with a single read and at most a single write per file;
+        files whose content ends up unchanged are not written, so b2 does not see a newer mtime and rebuild dependants
+        """
+        rewrites_by_path = {}
+        for path, search, replace, strict in rewrites:
+            rewrites_by_path.setdefault(path, []).append((search, replace, strict))
+        for path, file_rewrites in rewrites_by_path.items():
+            full_path = os.path.join(self.source_folder, self._source_subfolder, path)
+            with open(full_path, "rb") as f:
+                original = f.read()
+            content = original
+            for search, replace, strict in file_rewrites:
+                search_bytes = search.encode("utf-8")
+                if search_bytes not in content:
+                    message = f"replace_in_file didn't find pattern '{search}' in '{full_path}' file."
+                    if strict:
+                        raise ConanException(message)
+                    self.output.warn(message)
+                    continue
+                content = content.replace(search_bytes, replace.encode("utf-8"))
+            if content == original:
+                continue
+            # Write + rename, so an interrupted build never leaves a truncated file in the shared source folder
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), prefix=".conan-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            shutil.copymode(full_path, tmp_path)
+            os.replace(tmp_path, full_path)
+
+    def build(self):
+        self._rewrite_source_files(self._source_rewrites)
 
         if self.options.header_only:
             self.output.warn("Header only package, skipping build")
             return
 
-        self._clean()
+        b2_flags = self._build_flags
+        user_config_jam = self._user_config_jam
+        fingerprint = self._build_fingerprint(b2_flags, user_config_jam)
+        if self.options.incremental and self._load_build_fingerprint() == fingerprint:
+            self.output.info("incremental build: b2 flags, user-config.jam and toolchain are unchanged, keeping bin.v2")
+        else:
+            if self.options.incremental:
+                self.output.info("incremental build: b2 flags, user-config.jam or toolchain changed, building from scratch")
+            self._clean()
+        save(self, self._build_fingerprint_file, fingerprint)
 
         if self._use_bcp:
-            self._build_bcp()
-            self._run_bcp()
+            self._prepare_bcp_tree()
+        if self.options.unity_build:
+            sources = self._configure_unity_build(self._boost_dir)
+        else:
+            sources = os.path.join(self.source_folder, self._boost_dir)
 
         # Help locating bzip2 and zlib
-        self._create_user_config_jam(self._boost_build_dir)
+        self._create_user_config_jam(self._boost_build_dir, user_config_jam)
 
-        # JOIN ALL FLAGS
-        b2_flags = " ".join(self._build_flags)
-        full_command = f"{self._b2_exe} {b2_flags}"
-        # -d2 is to print more debug info and avoid travis timing out without output
-        sources = os.path.join(self.source_folder, self._boost_dir)
-        full_command += f' --debug-configuration --build-dir="{self.build_folder}"'
-        self.output.warn(full_command)
+        if self._build_timing:
+            for xml_file in glob.glob(os.path.join(self.build_folder, "b2-build*.xml")):
+                os.unlink(xml_file)
+
+        # The counters of the compiler cache are lifetime totals, report how they change during this build
+        compiler_launcher_stats = self._compiler_launcher_stats()
 
         # If sending a user-specified toolset to B2, setting the vcvars
         # interferes with the compiler selection.
         use_vcvars = (self._is_msvc or self._is_clang_cl) and not self.settings.compiler.get_safe("toolset", default="")
         with tools.vcvars(self.settings, only_diff=False) if use_vcvars else tools.no_op(): # https://github.com/conan-io/conan/issues/6577
             with chdir(self, sources):
-                # To show the libraries *1
-                # self.run("%s --show-libraries" % b2_exe)
-                self.run(full_command, run_environment=True)
+                with tools.environment_append(self._compiler_launcher_env):
+                    # To show the libraries *1
+                    # self.run("%s --show-libraries" % b2_exe)
+                    try:
+                        if self.options.library_workers:
+                            self._run_b2_library_graph(b2_flags)
+                        elif self.options.memory_aware_jobs:
+                            self._run_memory_aware_b2(b2_flags)
+                        else:
+                            self._run_b2(b2_flags)
+                    finally:
+                        # Also, and especially, when the build failed
+                        if self._build_timing:
+                            self._write_build_timing()
+
+        self._report_compiler_launcher_stats(compiler_launcher_stats)
+
+    def _run_b2(self, b2_flags, name=None, rusage_file=None):
+        """
+        :param name: name of the b2 pass, when build() runs b2 several times
+        :param rusage_file: file to write the peak memory of the largest process to, see RUSAGE_WRAPPER_SCRIPT
+        """
+        full_command = self._b2_command(b2_flags, name)
+        python = self._rusage_python if rusage_file else None
+        if python:
+            wrapper = os.path.join(self.build_folder, "b2-rusage.py")
+            save(self, wrapper, RUSAGE_WRAPPER_SCRIPT)
+            full_command = f'"{python}" "{wrapper}" "{rusage_file}" {full_command}'
+        self.output.warn(full_command)
+        if rusage_file and not python:
+            # The peak of the children of conan itself only tells about this pass when it is a new maximum
+            peak_before = children_peak_memory_mib()
+            self.run(full_command, run_environment=True)
+            peak = children_peak_memory_mib()
+            save(self, rusage_file, str(peak if peak > peak_before else 0))
+            return
+        self.run(full_command, run_environment=True)
+
+    @property
+    def _rusage_python(self):
+        """
+        :return: python interpreter to run RUSAGE_WRAPPER_SCRIPT with, or None if there is none
+        """
+        if not getattr(sys, "frozen", False):
+            return sys.executable
+        # In the conan installers, sys.executable is the frozen conan binary, not a python interpreter
+        python = self.options.get_safe("python_executable") or tools.which("python3") or tools.which("python")
+        return str(python).replace("\\", "/") if python else None
+
+    def _b2_command(self, b2_flags, name=None, build_dir=None):
+        # JOIN ALL FLAGS
+        full_command = f"{self._b2_exe} {' '.join(b2_flags)}"
+        # -d2 is to print more debug info and avoid travis timing out without output
+        full_command += f' --debug-configuration --build-dir="{build_dir or self.build_folder}"'
+        if self._build_timing:
+            full_command += f' --out-xml="{self._b2_xml_file(name)}"'
+        return full_command
+
+    def _run_b2_library_graph(self, b2_flags):
+        """
+        build every library with a b2 run of its own as soon as the libraries it depends on are built, so that
+        a failing library does not stop the independent ones; then install them all with a last b2 run,
+        which finds everything up to date
+        """
+        workers = int(str(self.options.library_workers))
+        jobs = max(1, build_jobs(self) // workers)
+        libraries = sorted(self._built_modules)
+        dependencies = {library: set(self._dependencies["dependencies"].get(library, [])).intersection(libraries)
+                        for library in libraries}
+        # Every b2 run rewrites config.log and project-cache.jam of its build dir, and builds and stages the targets
+        # its libraries share (config checks, cmake configs of the headers, ...): each run gets a build dir and a
+        # stagedir of its own, seeded with what its dependencies built, and the build dirs are merged at the end
+        worker_folder = os.path.join(self.build_folder, "b2-workers")
+        if os.path.isdir(worker_folder):
+            shutil.rmtree(worker_folder)
+        log_folder = os.path.join(self.build_folder, "b2-logs")
+        mkdir(self, log_folder)
+        commands = {}
+        for library in libraries:
+            build_dir = os.path.join(worker_folder, library, "build")
+            flags = self._get_build_flags(jobs=jobs, libraries=[library], stagedir=os.path.join(worker_folder, library, "stage"))
+            commands[library] = self._b2_command(flags, library, build_dir=build_dir)
+
+        self.output.info(f"building {len(libraries)} libraries, {workers} at a time with -j{jobs}")
+        start = time.time()
+        results = {}
+        pending = set(libraries)
+        running = {}
+        with tools.run_environment(self):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                while pending or running:
+                    waiting = len(pending)
+                    for library in sorted(pending):
+                        statuses = [results[d]["status"] if d in results else None for d in dependencies[library]]
+                        if "failed" in statuses or "skipped" in statuses:
+                            failed = sorted(d for d in dependencies[library] if d in results and results[d]["status"] != "built")
+                            results[library] = {"status": "skipped", "reason": f"{', '.join(failed)} did not build"}
+                            pending.remove(library)
+                            self.output.warn(f"{library}: skipped, {results[library]['reason']}")
+                        elif all(status == "built" for status in statuses):
+                            log_file = os.path.join(log_folder, f"{library}.log")
+                            self._seed_worker_build_dir(os.path.join(worker_folder, library, "build"),
+                                                        [os.path.join(worker_folder, d, "build") for d in dependencies[library]],
+                                                        library)
+                            running[executor.submit(self._run_b2_library, commands[library], log_file)] = library
+                            pending.remove(library)
+                    if not running:
+                        if len(pending) == waiting:
+                            raise ConanException(f"dependency cycle between {', '.join(sorted(pending))}")
+                        continue
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        library = running.pop(future)
+                        results[library] = future.result()
+                        result = results[library]
+                        self.output.info(f"{library}: {result['status']} in {result['seconds']} s "
+                                         f"({result['attempts']} attempts), log in {result['log']}")
+
+        report = self._library_graph_report(dependencies, results)
+        report.update({"workers": workers, "jobs": jobs, "wall_seconds": round(time.time() - start, 3)})
+        save(self, os.path.join(self.build_folder, "b2-graph.json"), json.dumps(report, indent=2))
+        critical_path = report["critical_path"]
+        self.output.info(f"critical path ({critical_path['seconds']} s): {' -> '.join(critical_path['libraries'])}")
+
+        failed = sorted(library for library, result in results.items() if result["status"] == "failed")
+        skipped = sorted(library for library, result in results.items() if result["status"] == "skipped")
+        for library in failed:
+            with open(results[library]["log"], encoding="utf-8", errors="replace") as f:
+                tail = f.readlines()[-30:]
+            self.output.error(f"{library} failed, end of {results[library]['log']}:\n{''.join(tail)}")
+        if failed:
+            raise ConanException(f"b2 failed to build {', '.join(failed)}" + (f", skipped {', '.join(skipped)}" if skipped else ""))
+
+        for library in libraries:
+            merge_tree(os.path.join(worker_folder, library, "build"), self.build_folder)
+        shutil.rmtree(worker_folder)
+        self._run_b2(b2_flags)
+
+    def _seed_worker_build_dir(self, build_dir, dependency_build_dirs, library):
+        """
+        fill the build dir of a library's b2 run with the targets its dependencies' runs built, and with what a
+        previous (incremental) build left of the library itself, so that b2 finds them up to date
+        """
+        trees = [(dependency_build_dir, build_dir) for dependency_build_dir in dependency_build_dirs]
+        for previous in glob.glob(os.path.join(self.build_folder, "*", "bin.v2", "libs", library)):
+            trees.append((previous, os.path.join(build_dir, os.path.relpath(previous, self.build_folder))))
+        mkdir(self, build_dir)
+        for src, dst in trees:
+            if os.path.isdir(src):
+                # Never hardlink: b2 rewrites some targets in place (config.log, project-cache.jam, archives updated
+                # by ar), which would change the dependencies' build dirs too
+                clone_tree(src, dst, allow_hardlinks=False)
+
+    @staticmethod
+    def _run_b2_library(command, log_file):
+        start = time.time()
+        with open(log_file, "w", encoding="utf-8") as log:
+            for attempt in range(1, B2_LIBRARY_ATTEMPTS + 1):
+                log.write(f"# attempt {attempt}: {command}\n")
+                log.flush()
+                offset = log.tell()
+                returncode = subprocess.call(command, shell=True, stdout=log, stderr=subprocess.STDOUT)
+                if returncode == 0:
+                    break
+                with open(log_file, "rb") as output:
+                    output.seek(offset)
+                    if not B2_TRANSIENT_FAILURE_RE.search(output.read().decode("utf-8", errors="replace")):
+                        break
+        end = time.time()
+        return {
+            "status": "built" if returncode == 0 else "failed",
+            "attempts": attempt,
+            "start": start,
+            "end": end,
+            "seconds": round(end - start, 3),
+            "log": log_file,
+        }
+
+    @staticmethod
+    def _library_graph_report(dependencies, results):
+        """
+        :return: report of the per library builds, with the chain of dependent builds that took the longest
+        """
+        chains = {}
+
+        def chain(library):
+            # (seconds, libraries) of the longest chain of builds ending with library
+            if library not in chains:
+                built = [d for d in dependencies[library] if results[d]["status"] == "built"]
+                seconds, path = max((chain(d) for d in built), key=lambda c: c[0], default=(0.0, []))
+                chains[library] = (seconds + results[library]["seconds"], path + [library])
+            return chains[library]
+
+        seconds, path = max((chain(library) for library, result in results.items() if result["status"] == "built"),
+                            key=lambda c: c[0], default=(0.0, []))
+        return {
+            "libraries": results,
+            "critical_path": {"seconds": round(seconds, 3), "libraries": path},
+        }
+
+    def _run_memory_aware_b2(self, b2_flags):
+        """
+        build the memory hungry libraries one after the other with as many jobs as the available memory allows,
+        then everything else at full width (b2 finds the memory hungry ones up to date)
+        """
+        estimates = self._load_user_cache(self._memory_estimates_file)
+        # RUSAGE_CHILDREN is POSIX only, without it the estimates are not calibrated
+        calibrate = os.name == "posix"
+        for library in sorted(set(HEAVY_LIBRARY_MEMORY_ESTIMATES).intersection(self._built_modules)):
+            key = f"{self._toolset_tag}/{library}"
+            estimate = estimates.get(key, HEAVY_LIBRARY_MEMORY_ESTIMATES[library])
+            jobs = self._memory_capped_jobs(estimate)
+            self.output.info(f"building {library} with -j{jobs} ({estimate} MiB per job)")
+            rusage_file = os.path.join(self.build_folder, f"b2-rusage-{library}.txt") if calibrate else None
+            self._run_b2(self._get_build_flags(jobs=jobs, libraries=[library]), name=library, rusage_file=rusage_file)
+            if rusage_file:
+                with open(rusage_file, encoding="utf-8") as f:
+                    peak = int(f.read().strip() or 0)
+                # A lower peak means nothing was compiled (b2 only checked the targets), which tells nothing
+                if peak > LIGHT_LIBRARY_MEMORY_ESTIMATE:
+                    self.output.info(f"{library}: peak memory of a job {peak} MiB")
+                    estimates.pop(key, None)
+                    estimates[key] = peak
+                    self._save_user_cache(self._memory_estimates_file, estimates)
+        jobs = self._memory_capped_jobs(LIGHT_LIBRARY_MEMORY_ESTIMATE)
+        self._run_b2(b2_flags if jobs == build_jobs(self) else self._get_build_flags(jobs=jobs))
+
+    def _memory_capped_jobs(self, memory_per_job):
+        jobs = build_jobs(self)
+        available = available_memory_mib()
+        if available is None:
+            return jobs
+        # Keep some headroom for the estimate being wrong and for b2 itself
+        return max(1, min(jobs, int(available * 0.9 // (memory_per_job * 1.2))))
+
+    @property
+    def _memory_estimates_file(self):
+        return os.path.join(self._user_cache_folder, "memory-estimates.json")
+
+    @property
+    def _built_modules(self):
+        """
+        :return: the configure options b2 builds
+        """
+        if self.options.targeted_build:
+            return self._targeted_modules
+        return [libname for libname in self._configure_options if not self.options.get_safe(f"without_{libname}")]
+
+    @property
+    def _build_timing(self):
+        return tools.get_env("CONAN_BOOST_BUILD_TIMING", False)
+
+    def _b2_xml_file(self, name=None):
+        return os.path.join(self.build_folder, f"b2-build-{name}.xml" if name else "b2-build.xml")
+
+    def _write_build_timing(self):
+        """
+        write b2-timing.json and b2-timing.trace.json (for chrome://tracing or Perfetto) from the b2-build*.xml files
+        """
+        xml_files = sorted(glob.glob(os.path.join(self.build_folder, "b2-build*.xml")))
+        if not xml_files:
+            self.output.warn("b2-build.xml was not written by b2, no timing report")
+            return
+        actions = []
+        for xml_file in xml_files:
+            actions.extend(parse_b2_xml(xml_file))
+        report, trace = b2_timing_report(actions)
+        save(self, os.path.join(self.build_folder, "b2-timing.json"), json.dumps(report, indent=2))
+        save(self, os.path.join(self.build_folder, "b2-timing.trace.json"), json.dumps(trace))
+        self.output.info(f"b2 ran {report['actions']} actions in {report['wall_seconds']} s, slowest libraries:")
+        for library in report["libraries"][:5]:
+            self.output.info(f"  {library['name']}: compile {library['compile_seconds']} s, link {library['link_seconds']} s")
+
+    @property
+    def _compiler_launcher(self):
+        """
+        :return: full path to the compiler launcher (ccache, sccache, ...), or None, if not used
+        """
+        if not self.options.get_safe("compiler_launcher"):
+            return None
+        return self._toolchain["compiler_launcher"]
+
+    def _detect_compiler_launcher(self):
+        launcher = self.options.get_safe("compiler_launcher")
+        if not launcher:
+            return None
+        launcher_path = tools.which(str(launcher))
+        if not launcher_path:
+            raise ConanException(f"Cannot find compiler_launcher {launcher}")
+        return launcher_path.replace("\\", "/")
+
+    @property
+    def _compiler_launcher_name(self):
+        if not self._compiler_launcher:
+            return None
+        return os.path.splitext(os.path.basename(self._compiler_launcher))[0].lower()
+
+    @property
+    def _compiler_launcher_env(self):
+        if self._compiler_launcher_name != "ccache":
+            return {}
+        # Paths below the base dir are hashed relative to the working directory,
+        # so the same source compiled in another configuration's folder still hits
+        return {
+            "CCACHE_BASEDIR": os.path.commonpath([self.source_folder, self.build_folder]),
+            "CCACHE_NOHASHDIR": "1",
+        }
+
+    def _compiler_launcher_stats(self):
+        """
+        snapshot of the counters of the compiler cache, which are totals over the whole life of the cache
+        :return: dict of counter name -> value, or None, if the compiler launcher is not a known cache or has failed
+        """
+        stats_args = {
+            "ccache": ["--print-stats"],
+            "sccache": ["--show-stats", "--stats-format=json"],
+        }.get(self._compiler_launcher_name)
+        if not stats_args:
+            return None
+        try:
+            result = subprocess.run([self._compiler_launcher] + stats_args, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, universal_newlines=True)
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        return parse_compiler_launcher_stats(self._compiler_launcher_name, result.stdout)
+
+    def _report_compiler_launcher_stats(self, stats_before):
+        """
+        print the hits and misses of the compiler cache during this build
+        :param stats_before: result of _compiler_launcher_stats before b2 was run
+        """
+        if self._compiler_launcher_name not in COMPILER_LAUNCHER_HIT_MISS_COUNTERS:
+            return
+        stats_after = self._compiler_launcher_stats()
+        if stats_before is None or stats_after is None:
+            self.output.warn(f"couldn't get the statistics of {self._compiler_launcher_name}")
+            return
+        delta = {name: value - stats_before.get(name, 0) for name, value in stats_after.items()}
+        hit_counters, miss_counters = COMPILER_LAUNCHER_HIT_MISS_COUNTERS[self._compiler_launcher_name]
+        hits = sum(delta.get(name, 0) for name in hit_counters)
+        misses = sum(delta.get(name, 0) for name in miss_counters)
+        hit_rate = f" ({100.0 * hits / (hits + misses):.1f}% hit rate)" if hits + misses else ""
+        self.output.info(f"{self._compiler_launcher_name} statistics of this build: {hits} hits, {misses} misses{hit_rate}")
+        others = {name: value for name, value in delta.items()
+                  if value and name not in hit_counters and name not in miss_counters}
+        if others:
+            self.output.info("  " + ", ".join(f"{name}: {value}" for name, value in sorted(others.items())))
 
     @property
     def _b2_os(self):
@@ -1044,6 +2567,15 @@ class BoostConan(ConanFile):
 
     @property
     def _build_flags(self):
+        return self._get_build_flags()
+
+    def _get_build_flags(self, jobs=None, libraries=None, stagedir=None):
+        """
+        :param jobs: b2 -j value, build_jobs by default
+        :param libraries: libraries to build instead of the ones selected by the options
+        :param stagedir: stage the libraries there instead of installing them into the package folder
+        :return: list of b2 arguments
+        """
         flags = self._build_cross_flags
 
         # Stop at the first error. No need to continue building.
@@ -1108,17 +2640,23 @@ class BoostConan(ConanFile):
         flags.append(f"threading={'single' if not self.options.multithreading else 'multi'}")
         flags.append(f"visibility={self.options.visibility}")
 
-        flags.append(f"link={'shared' if self._shared else 'static'}")
-        if self.settings.build_type == "Debug":
-            flags.append("variant=debug")
-        else:
-            flags.append("variant=release")
+        links, variants = self._build_variants
+        flags.append(f"link={','.join(links)}")
+        flags.append(f"variant={','.join(variants)}")
 
-        for libname in self._configure_options:
-            if getattr(self.options, f"without_{libname}"):
-                flags.append(f"--without-{libname}")
-            elif not getattr(self.options, f"without_{libname}"):
+        if libraries is not None:
+            for libname in libraries:
+                flags.append(f"--with-{libname}")
+        elif self.options.targeted_build:
+            # b2 only builds the libraries passed with --with-*
+            for libname in self._targeted_modules:
                 flags.append(f"--with-{libname}")
+        else:
+            for libname in self._configure_options:
+                if getattr(self.options, f"without_{libname}"):
+                    flags.append(f"--without-{libname}")
+                elif not getattr(self.options, f"without_{libname}"):
+                    flags.append(f"--with-{libname}")
 
         flags.append(f"toolset={self._toolset}")
 
@@ -1229,6 +2767,11 @@ class BoostConan(ConanFile):
         link_flags = f'linkflags="{" ".join(link_flags)}"'
         flags.append(link_flags)
 
+        if self._compiler_launcher and self._toolset in GCC_COMPATIBLE_TOOLSETS:
+            # Keep the cache keys independent of the (configuration specific) folders
+            for folder in (self.source_folder, self.build_folder):
+                cxx_flags.append(f"-fdebug-prefix-map={folder}=.")
+
         if self.options.get_safe("addr2line_location"):
             cxx_flags.append(f"-DBOOST_STACKTRACE_ADDR2LINE_LOCATION={self.options.addr2line_location}")
 
@@ -1243,15 +2786,104 @@ class BoostConan(ConanFile):
         if self.options.extra_b2_flags:
             flags.extend(shlex.split(str(self.options.extra_b2_flags)))
 
+        if stagedir:
+            flags.extend([
+                "stage",
+                f"--stagedir={stagedir}",
+            ])
+        elif self.options.targeted_build:
+            # Headers are copied by package(), much faster than the install rules of b2
+            flags.extend([
+                "stage",
+                f"--stagedir={self.package_folder}",
+            ])
+        else:
+            flags.extend([
+                "install",
+                f"--prefix={self.package_folder}",
+            ])
         flags.extend([
-            "install",
-            f"--prefix={self.package_folder}",
-            f"-j{build_jobs(self)}",
+            f"-j{jobs or build_jobs(self)}",
             "--abbreviate-paths",
             "-d%d" % self.options.debug_level,
         ])
         return flags
 
+    @property
+    def _build_variant(self):
+        """
+        :return: (link, variant) of the configuration
+        """
+        return "shared" if self._shared else "static", "debug" if self.settings.build_type == "Debug" else "release"
+
+    @property
+    def _build_variants(self):
+        """
+        :return: the b2 link and variant values to build: the ones of the configuration plus the build_variants option
+        """
+        link, variant = self._build_variant
+        links = {link}
+        variants = {variant}
+        if self.options.get_safe("build_variants"):
+            for extra in str(self.options.build_variants).split(","):
+                extra = extra.strip()
+                if extra in ("static", "shared"):
+                    links.add(extra)
+                elif extra in ("debug", "release"):
+                    variants.add(extra)
+                else:
+                    raise ConanInvalidConfiguration(f"Unknown build variant '{extra}', use static, shared, debug or release")
+        return sorted(links), sorted(variants)
+
+    def _library_file_variant(self, filename):
+        """
+        :return: (link, variant) a library file of the package belongs to, or None, if it is not a library
+        """
+        if filename.endswith(".a") or (filename.endswith(".lib") and filename.startswith("lib")):
+            link = "static"
+        elif filename.endswith((".lib", ".dll", ".dylib")) or ".so" in filename:
+            link = "shared"
+        else:
+            return None
+        variant = self._build_variant[1]
+        if len(self._build_variants[1]) > 1:
+            # tagged/versioned layout: the abi tag (e.g. "-d", "-gd", "-sgd") marks debug libraries
+            variant = "debug" if re.search(r"-[sgyp]*d[-.]", filename) else "release"
+        return link, variant
+
+    def _package_build_variants(self):
+        """
+        Move the libraries of the extra build_variants to lib/<link>_<variant>, lib keeps the configured variant
+        """
+        lib_folder = os.path.join(self.package_folder, "lib")
+        if not os.path.isdir(lib_folder):
+            return
+        static_only = tuple(self._dependencies["static_only"])
+        for filename in os.listdir(lib_folder):
+            if not os.path.isfile(os.path.join(lib_folder, filename)):
+                continue
+            file_variant = self._library_file_variant(filename)
+            if file_variant is None or file_variant == self._build_variant:
+                continue
+            if file_variant[0] == "static" and file_variant[1] == self._build_variant[1] and \
+               any(name in filename for name in static_only):
+                # Always static, also part of a shared build
+                continue
+            variant_folder = os.path.join(lib_folder, "_".join(file_variant))
+            mkdir(self, variant_folder)
+            rename(self, os.path.join(lib_folder, filename), os.path.join(variant_folder, filename))
+
+    @property
+    def _targeted_modules(self):
+        """
+        :return: the enabled configure options, plus the configure options they depend on
+        """
+        modules = set()
+        for libname in self._configure_options:
+            if not self.options.get_safe(f"without_{libname}", True):
+                modules.update(self._all_dependent_modules(libname))
+        return sorted(modules.intersection(self._configure_options))
+
     @property
     def _build_cross_flags(self):
         flags = []
@@ -1279,26 +2911,82 @@ class BoostConan(ConanFile):
 
     @property
     def _ar(self):
-        if os.environ.get("AR"):
-            return os.environ["AR"]
-        if is_apple_os(self) and self.settings.compiler == "apple-clang":
-            return tools.XCRun(self.settings).ar
-        return None
+        return self._toolchain["ar"]
 
     @property
     def _ranlib(self):
-        if os.environ.get("RANLIB"):
-            return os.environ["RANLIB"]
-        if is_apple_os(self) and self.settings.compiler == "apple-clang":
-            return tools.XCRun(self.settings).ranlib
-        return None
+        return self._toolchain["ranlib"]
 
     @property
     def _cxx(self):
-        if os.environ.get("CXX"):
-            return os.environ["CXX"]
-        if is_apple_os(self) and self.settings.compiler == "apple-clang":
-            return tools.XCRun(self.settings).cxx
+        return self._toolchain["cxx"]
+
+    @property
+    def _toolchain(self):
+        """
+        executables used by the build, resolved once: tools.which scans the PATH and tools.XCRun spawns xcrun
+        :return: dict with the toolset, its version and tag, and the compiler, archiver, ranlib, b2, apple SDK and
+                 compiler launcher paths
+        """
+        if self._cached_toolchain is None:
+            cache_key = self._toolchain_cache_key
+            cached_toolchains = self._load_user_cache(self._toolchain_cache_file) if cache_key else {}
+            toolchain = cached_toolchains.get(cache_key)
+            if toolchain and self._toolchain_exists(toolchain):
+                self.output.info("using cached toolchain")
+            else:
+                toolchain = self._detect_toolchain()
+                if cache_key:
+                    cached_toolchains.pop(cache_key, None)
+                    cached_toolchains[cache_key] = toolchain
+                    # Keep the most recent toolchains only, so the cache does not grow forever
+                    self._save_user_cache(self._toolchain_cache_file, dict(list(cached_toolchains.items())[-64:]))
+            self._cached_toolchain = toolchain
+        return self._cached_toolchain
+
+    def _detect_toolchain(self):
+        xcrun = tools.XCRun(self.settings) if is_apple_os(self) and self.settings.compiler == "apple-clang" else None
+        ar = os.environ.get("AR") or (xcrun.ar if xcrun else None)
+        ranlib = os.environ.get("RANLIB") or (xcrun.ranlib if xcrun else None)
+        return {
+            "toolset": self._toolset,
+            "toolset_version": self._toolset_version,
+            "toolset_tag": self._toolset_tag,
+            "cxx": os.environ.get("CXX") or (xcrun.cxx if xcrun else self._detect_cxx()),
+            "ar": ar,
+            "ar_path": tools.which(ar) if ar else None,
+            "ranlib": ranlib,
+            "ranlib_path": tools.which(ranlib) if ranlib else None,
+            "b2": self._detect_b2_exe(),
+            "sdk_path": xcrun.sdk_path if xcrun else None,
+            "compiler_launcher": self._detect_compiler_launcher(),
+        }
+
+    @staticmethod
+    def _toolchain_exists(toolchain):
+        for name in ("cxx", "ar_path", "ranlib_path", "b2", "compiler_launcher"):
+            if toolchain.get(name) and os.path.isabs(toolchain[name]) and not os.path.isfile(toolchain[name]):
+                return False
+        return not toolchain.get("sdk_path") or os.path.isdir(toolchain["sdk_path"])
+
+    @property
+    def _toolchain_cache_key(self):
+        """
+        :return: hash of everything the toolchain detection depends on, or None if CONAN_BOOST_TOOLCHAIN_CACHE is not enabled
+        """
+        if not tools.get_env("CONAN_BOOST_TOOLCHAIN_CACHE", False):
+            return None
+        key = {name: os.environ.get(name) for name in ("PATH", "CXX", "AR", "RANLIB", "DEVELOPER_DIR", "SDKROOT")}
+        key["settings"] = {name: str(self.settings.get_safe(name)) for name in
+                           ("os", "os.version", "os.sdk", "arch", "compiler", "compiler.version", "compiler.toolset")}
+        key["compiler_launcher"] = str(self.options.get_safe("compiler_launcher"))
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def _toolchain_cache_file(self):
+        return os.path.join(self._user_cache_folder, "toolchain.json")
+
+    def _detect_cxx(self):
         compiler_version = str(self.settings.compiler.version)
         major = compiler_version.split(".", maxsplit=1)[0]
         if self.settings.compiler == "gcc":
@@ -1307,10 +2995,18 @@ class BoostConan(ConanFile):
             return tools.which(f"clang++-{compiler_version}") or tools.which(f"clang++-{major}") or tools.which("clang++") or ""
         return ""
 
-    def _create_user_config_jam(self, folder):
+    def _create_user_config_jam(self, folder, contents):
         """To help locating the zlib and bzip2 deps"""
         self.output.warn("Patching user-config.jam")
+        self.output.warn(contents)
+        filename = f"{folder}/user-config.jam"
+        save(self, filename, contents)
 
+    @property
+    def _user_config_jam(self):
+        """
+        :return: contents of user-config.jam
+        """
         contents = ""
         if self._zip_bzip2_requires_needed:
             def create_library_config(deps_name, name):
@@ -1345,14 +3041,24 @@ class BoostConan(ConanFile):
         contents += f'\nusing "{self._toolset}" : {self._toolset_version} : '
 
         cxx_fwd_slahes = self._cxx.replace("\\", "/")
+        launcher = ""
+        if self._compiler_launcher:
+            if cxx_fwd_slahes:
+                launcher = self._compiler_launcher
+            else:
+                self.output.warn("compiler_launcher is ignored, because the compiler executable is unknown (set CXX)")
         if self._is_msvc:
+            if launcher:
+                contents += f' "{launcher}"'
             contents += f' "{cxx_fwd_slahes}"'
         else:
+            if launcher:
+                contents += f' {launcher}'
             contents += f' {cxx_fwd_slahes}'
 
         if is_apple_os(self):
             if self.settings.compiler == "apple-clang":
-                contents += f" -isysroot {tools.XCRun(self.settings).sdk_path}"
+                contents += f" -isysroot {self._toolchain['sdk_path']}"
             if self.settings.get_safe("arch"):
                 contents += f" -arch {tools.to_apple_arch(self.settings.arch)}"
 
@@ -1365,10 +3071,10 @@ class BoostConan(ConanFile):
         #self.output.info('(2) collected_cxx_flags = %s' % (collected_cxx_flags))
 
         if self._ar:
-            ar_path = tools.which(self._ar).replace("\\", "/")
+            ar_path = (self._toolchain["ar_path"] or self._ar).replace("\\", "/")
             contents += f'<archiver>"{ar_path}" '
         if self._ranlib:
-            ranlib_path = tools.which(self._ranlib).replace("\\", "/")
+            ranlib_path = (self._toolchain["ranlib_path"] or self._ranlib).replace("\\", "/")
             contents += f'<ranlib>"{ranlib_path}" '
         cxxflags = tools.get_env("CXXFLAGS", "") + " "# + collected_cxx_flags + " "
         cflags = tools.get_env("CFLAGS", "") + " "# + collected_cxx_flags + " "
@@ -1392,10 +3098,49 @@ class BoostConan(ConanFile):
             contents += f'<asmflags>"{asflags.strip()}" '
 
         contents += " ;"
+        return contents
 
-        self.output.warn(contents)
-        filename = f"{folder}/user-config.jam"
-        save(self, filename, contents)
+    @property
+    def _toolchain_fingerprint(self):
+        """
+        :return: identity of the compiler and b2 executables, which b2 does not track in bin.v2
+        """
+        fingerprint = {
+            "toolset": self._toolset,
+            "toolset_version": self._toolset_version,
+            "compiler": str(self.settings.compiler),
+            "compiler_version": str(self.settings.compiler.version),
+        }
+        for name, executable in (("cxx", self._cxx), ("b2", self._b2_exe)):
+            path = executable
+            if executable and not os.path.isfile(executable):
+                path = tools.which(executable)
+            fingerprint[name] = file_identity(path) if path else executable
+        return fingerprint
+
+    def _build_fingerprint(self, b2_flags, user_config_jam):
+        """
+        :return: hash of everything that makes the content of bin.v2 unusable when it changes
+        """
+        # Parallelism, verbosity and the destination do not change what is built
+        flags = [flag for flag in b2_flags if not flag.startswith(("-j", "-d", "--prefix=", "--stagedir="))]
+        fingerprint = {
+            "b2_flags": flags,
+            "user_config_jam": user_config_jam,
+            "toolchain": self._toolchain_fingerprint,
+        }
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def _build_fingerprint_file(self):
+        return os.path.join(self.build_folder, "conan-build-fingerprint.txt")
+
+    def _load_build_fingerprint(self):
+        try:
+            with open(self._build_fingerprint_file, encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
 
     @property
     def _toolset_version(self):
@@ -1477,12 +3222,15 @@ class BoostConan(ConanFile):
         self.copy("LICENSE_1_0.txt", dst="licenses", src=os.path.join(self.source_folder,
                                                                       self._source_subfolder))
         rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
-        if self.options.header_only:
-            self.copy(pattern="*", dst="include/boost", src=f"{self._boost_dir}/boost")
+        if self.options.header_only or self.options.targeted_build:
+            self._package_headers()
 
         if self.settings.os == "Emscripten" and not self.options.header_only:
             self._create_emscripten_libs()
 
+        if self.options.get_safe("build_variants"):
+            self._package_build_variants()
+
         if self._is_msvc and self._shared:
             # Some boost releases contain both static and shared variants of some libraries (if shared=True)
             all_libs = set(tools.collect_libs(self, "lib"))
@@ -1504,6 +3252,21 @@ class BoostConan(ConanFile):
 
         rm(self, "*.pdb", os.path.join(self.package_folder, "bin"))
 
+    def _package_headers(self):
+        include_folder = os.path.join(self.package_folder, "include")
+        if self.options.layout == "versioned" and not self.options.header_only:
+            version = Version(self.version)
+            include_folder = os.path.join(include_folder, f"boost-{version.major}_{version.minor}")
+        src = os.path.join(self.source_folder, self._boost_dir, "boost")
+        dst = os.path.join(include_folder, "boost")
+        if os.path.isdir(dst):
+            # package() is called for the source and the build folder
+            return
+        # Never hardlink: the package and the source folder must not share files (read only package cache,
+        # headers patched in the package, source folder removal on Windows)
+        strategy = clone_tree(src, dst, allow_hardlinks=False, jobs=build_jobs(self))
+        self.output.info(f"Packaged headers of {src} using {strategy}")
+
     def _create_emscripten_libs(self):
         # Boost Build doesn't create the libraries, but it gets close,
         # leaving .bc files where the libraries would be.
@@ -1528,6 +3291,81 @@ class BoostConan(ConanFile):
             "python": None,  # FIXME: change to cpython when it becomes available
         }.get(name, name)
 
+    def _add_variant_components(self, link, variant, modules, module_libraries):
+        """
+        add the components of an extra build variant: "variant_<link>_<variant>_<module>" for every module component,
+        "variant_<link>_<variant>_headers" (with "_libboost" and "dynamic_linking" counterparts) with the defines
+        of that link type, and "variant_<link>_<variant>" requiring all of the module components
+        :param module_libraries: function returning the library names of a module for a link and variant
+        """
+        variant_name = f"{link}_{variant}"
+
+        def variant_folder(folder_link):
+            return "lib" if (folder_link, variant) == self._build_variant else os.path.join("lib", f"{folder_link}_{variant}")
+
+        # Libraries that are always static (static_only) sit with the static libraries of the variant
+        libdirs = [folder for folder in dict.fromkeys([variant_folder(link), variant_folder("static")])
+                   if os.path.isdir(os.path.join(self.package_folder, folder))]
+        detected_libraries = set()
+        for folder in libdirs:
+            detected_libraries.update(l[:-4] if l.endswith(".dll") else l for l in tools.collect_libs(self, folder))
+
+        # The headers and linking components of the configured variant carry the defines of its link type
+        # (BOOST_ALL_DYN_LINK through dynamic_linking), so every variant gets its own copy of them
+        variant_components = {name: f"variant_{variant_name}_{name.lstrip('_')}"
+                              for name in ("dynamic_linking", "headers", "_libboost")}
+
+        def variant_requirement(requirement):
+            if requirement in modules:
+                return f"variant_{variant_name}_{requirement}"
+            return variant_components.get(requirement, requirement)
+
+        def variant_defines(defines, python=False):
+            defines = [define for define in defines if define not in ("BOOST_ALL_DYN_LINK", "BOOST_PYTHON_STATIC_LIB")]
+            if python and link == "static":
+                defines.append("BOOST_PYTHON_STATIC_LIB")
+            return defines
+
+        for name, component_name in variant_components.items():
+            configured = self.cpp_info.components[name]
+            component = self.cpp_info.components[component_name]
+            component.libs = []
+            component.includedirs = list(configured.includedirs)
+            component.requires = [variant_requirement(requirement) for requirement in configured.requires]
+            component.defines = variant_defines(configured.defines)
+            component.system_libs = list(configured.system_libs)
+            component.cxxflags = list(configured.cxxflags)
+            component.sharedlinkflags = list(configured.sharedlinkflags)
+            component.exelinkflags = list(configured.exelinkflags)
+            component.set_property("cmake_target_name", f"Boost::{component_name}")
+            component.names["cmake_find_package"] = component_name
+            component.names["cmake_find_package_multi"] = component_name
+        if link == "shared":
+            self.cpp_info.components[variant_components["dynamic_linking"]].defines.append("BOOST_ALL_DYN_LINK")
+
+        aggregate = self.cpp_info.components[f"variant_{variant_name}"]
+        for module in modules:
+            configured = self.cpp_info.components[module]
+            component = self.cpp_info.components[f"variant_{variant_name}_{module}"]
+            component.libs = module_libraries(self._dependencies["libs"][module], link, variant) if configured.libs else []
+            missing = set(component.libs).difference(detected_libraries)
+            if missing:
+                self.output.warn(f"Boost component '{module}' of build variant {variant_name} is missing libraries: {sorted(missing)}")
+            component.libdirs = libdirs
+            component.bindirs = libdirs
+            component.requires = [variant_requirement(requirement) for requirement in configured.requires]
+            component.defines = variant_defines(configured.defines, python=module == "python")
+            component.system_libs = list(configured.system_libs)
+            component.set_property("cmake_target_name", f"Boost::variant_{variant_name}_{module}")
+            component.names["cmake_find_package"] = f"variant_{variant_name}_{module}"
+            component.names["cmake_find_package_multi"] = f"variant_{variant_name}_{module}"
+            aggregate.requires.append(f"variant_{variant_name}_{module}")
+
+        aggregate.libs = []
+        aggregate.set_property("cmake_target_name", f"Boost::variant_{variant_name}")
+        aggregate.names["cmake_find_package"] = f"variant_{variant_name}"
+        aggregate.names["cmake_find_package_multi"] = f"variant_{variant_name}"
+
     def package_info(self):
         self.env_info.BOOST_ROOT = self.package_folder
 
@@ -1668,19 +3506,12 @@ class BoostConan(ConanFile):
                 "ach": "",
                 "version": "",
             }
+            runtime_abi = ""
             if self._is_msvc:  # FIXME: mingw?
                 # FIXME: add 'y' when using cpython cci package and when python is built in debug mode
                 static_runtime_key = "s" if "MT" in msvc_runtime_flag(self) else ""
                 debug_runtime_key = "g" if "d" in msvc_runtime_flag(self) else ""
-                debug_key = "d" if self.settings.build_type == "Debug" else ""
-                abi = static_runtime_key + debug_runtime_key + debug_key
-                if abi:
-                    libsuffix_data["abi"] = f"-{abi}"
-            else:
-                debug_tag = "d" if self.settings.build_type == "Debug" else ""
-                abi = debug_tag
-                if abi:
-                    libsuffix_data["abi"] = f"-{abi}"
+                runtime_abi = static_runtime_key + debug_runtime_key
 
             libsuffix_data["arch"] = f"-{self._b2_architecture[0]}{self._b2_address_model}"
             version = Version(self.version)
@@ -1688,7 +3519,13 @@ class BoostConan(ConanFile):
                 libsuffix_data["version"] = f"-{version.major}_{version.minor}"
             else:
                 libsuffix_data["version"] = f"-{version.major}_{version.minor}_{version.patch}"
-            libsuffix = libsuffix_lut[str(self.options.layout)].format(**libsuffix_data)
+
+            def format_libsuffix(variant):
+                """ The runtime is the same for all build_variants, only the debug key of the abi tag differs. """
+                abi = runtime_abi + ("d" if variant == "debug" else "")
+                return libsuffix_lut[str(self.options.layout)].format(**{**libsuffix_data, "abi": f"-{abi}" if abi else ""})
+
+            libsuffix = format_libsuffix(self._build_variant[1])
             if libsuffix:
                 self.output.info(f"Library layout suffix: {repr(libsuffix)}")
 
@@ -1698,10 +3535,10 @@ class BoostConan(ConanFile):
                 libformatdata["py_major"] = pyversion.major
                 libformatdata["py_minor"] = pyversion.minor
 
-            def add_libprefix(n):
+            def add_libprefix(n, link):
                 """ On MSVC, static libraries are built with a 'lib' prefix. Some libraries do not support shared, so are always built as a static library. """
                 libprefix = ""
-                if self._is_msvc and (not self._shared or n in self._dependencies["static_only"]):
+                if self._is_msvc and (link == "static" or n in self._dependencies["static_only"]):
                     libprefix = "lib"
                 return libprefix + n
 
@@ -1709,7 +3546,7 @@ class BoostConan(ConanFile):
             all_expected_libraries = set()
             incomplete_components = []
 
-            def filter_transform_module_libraries(names):
+            def filter_transform_module_libraries(names, link=self._build_variant[0], variant=self._build_variant[1]):
                 libs = []
                 for name in names:
                     if name in ("boost_stacktrace_windbg", "boost_stacktrace_windbg_cached") and self.settings.os != "Windows":
@@ -1722,7 +3559,7 @@ class BoostConan(ConanFile):
                         continue
                     if not self.options.get_safe("numa") and "_numa" in name:
                         continue
-                    new_name = add_libprefix(name.format(**libformatdata)) + libsuffix
+                    new_name = add_libprefix(name.format(**libformatdata), link) + format_libsuffix(variant)
                     if self.options.namespace != 'boost':
                         new_name = new_name.replace("boost_", str(self.options.namespace) + "_")
                     if name.startswith("boost_python") or name.startswith("boost_numpy"):
@@ -1733,6 +3570,7 @@ class BoostConan(ConanFile):
                     libs.append(new_name)
                 return libs
 
+            module_components = []
             for module in self._dependencies["dependencies"].keys():
                 missing_depmodules = list(depmodule for depmodule in self._all_dependent_modules(module) if self.options.get_safe(f"without_{depmodule}", False))
                 if missing_depmodules:
@@ -1766,6 +3604,7 @@ class BoostConan(ConanFile):
                 self.cpp_info.components[module].bindirs.append("lib")
 
                 self.cpp_info.components[module].libs = module_libraries
+                module_components.append(module)
 
                 self.cpp_info.components[module].requires = self._dependencies["dependencies"][module] + ["_libboost"]
                 self.cpp_info.components[module].set_property("cmake_target_name", "Boost::" + module)
@@ -1860,7 +3699,26 @@ class BoostConan(ConanFile):
                     self.cpp_info.components["headers"].defines.extend(["BOOST_AC_USE_PTHREADS", "BOOST_SP_USE_PTHREADS"])
                 else:
                     self.cpp_info.components["headers"].defines.extend(["BOOST_AC_DISABLE_THREADS", "BOOST_SP_DISABLE_THREADS"])
+
+            if self.options.get_safe("build_variants"):
+                # The components of every extra variant mirror the module components of the configured one
+                # (requirements, system libs, defines and so link order), with the libraries of that variant
+                links, variants = self._build_variants
+                for link in links:
+                    for variant in variants:
+                        if (link, variant) == self._build_variant:
+                            continue
+                        variant_name = f"{link}_{variant}"
+                        if not os.path.isdir(os.path.join(self.package_folder, "lib", variant_name)):
+                            continue
+                        self._add_variant_components(link, variant, module_components, filter_transform_module_libraries)
+
         self.user_info.stacktrace_addr2line_available = self._stacktrace_addr2line_available
+        if not self.options.header_only:
+            # Lets consumers reuse the b2 toolset of the package without probing again
+            self.user_info.toolset = self._toolset
+            self.user_info.toolset_tag = self._toolset_tag
+            self.user_info.toolset_version = self._toolset_version
 
         self.output.info("LIBRARIES: %s" % self.cpp_info.libs)
         self.output.info("Package folder: %s" % self.package_folder)
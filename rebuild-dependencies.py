@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
+import concurrent.futures
 import dataclasses
+import hashlib
 from pathlib import Path
 import re
+import shutil
 import subprocess
 import tempfile
 from typing import Dict, List, Tuple
@@ -22,6 +25,9 @@ log.setLevel(logging.WARNING)
 
 BOOST_GIT_URL = "https://github.com/boostorg/boost.git"
 
+# Version of the layout of the dependencies-x.y.z.json index. Keep in sync with `conanfile.py`.
+DEPENDENCY_INDEX_FORMAT = 1
+
 # When adding (or removing) an option, also add this option to the list in
 # `conanfile.py` and re-run this script.
 CONFIGURE_OPTIONS = (
@@ -102,19 +108,90 @@ class BoostDependencies(object):
     export: BoostDependenciesExport
 
 
+@dataclasses.dataclass
+class JamfileDeclarations(object):
+    using: List[str]
+    libs: List[str]
+    boost_libs: List[Tuple[str, str]]
+
+
+class JamfileScanner(object):
+    """
+    Extracts the `using`, `lib`/`searched-lib` and `boost-lib` declarations of a Jamfile, reading it once.
+    Results are cached by content: most Jamfiles do not change between boost versions.
+    """
+    _USING_RE = re.compile(r"\n(.*)using\s+([^ ;:]+)\s*", flags=re.MULTILINE)
+    _LIB_RE = re.compile(r"\n(.*)\s(?:searched-)?lib\s+([^ \t\n;:]+)", flags=re.MULTILINE)
+    _BOOST_LIB_RE = re.compile(r"[ \n](boost-)?lib ([a-zA-Z0-9_]+)[ \n]")
+
+    _GREP_IGNORE_PREFIX = ("#", "\"")
+    _GREP_IGNORE_PARTS = ("boost", "<", ">")
+
+    _cache: Dict[str, JamfileDeclarations] = {}
+
+    @classmethod
+    def scan(cls, jam: Path) -> JamfileDeclarations:
+        contents = jam.read_bytes()
+        key = hashlib.sha256(contents).hexdigest()
+        if key not in cls._cache:
+            text = contents.decode(errors="replace")
+            cls._cache[key] = JamfileDeclarations(
+                using=cls._grep_libs(cls._USING_RE, text),
+                libs=cls._grep_libs(cls._LIB_RE, text),
+                boost_libs=cls._BOOST_LIB_RE.findall(text),
+            )
+        return cls._cache[key]
+
+    @classmethod
+    def _grep_libs(cls, regex, text):
+        res = set()
+        for m in regex.finditer(text):
+            # If text before main capture group contains a string or a comment => ignore
+            ignore = False
+            for ign in cls._GREP_IGNORE_PREFIX:
+                if ign in m.group(1):
+                    ignore = True
+            if ignore:
+                continue
+            l = m.group(2).lower()
+            ignore = False
+            for ign in cls._GREP_IGNORE_PARTS:
+                if ign in l:
+                    ignore = True
+            if ignore:
+                continue
+            res.add(l)
+        return list(res)
+
+
 class BoostDependencyBuilder(object):
-    def __init__(self, boost_version: str, boostdep_version: str, tmppath: Path, git_url: str, outputdir: Path, unsafe: bool):
+    def __init__(self, boost_version: str, boostdep_version: str, tmppath: Path, git_url: str, outputdir: Path, unsafe: bool,
+                 worktree: bool = False, force: bool = False, incremental_submodules: bool = False, shallow: bool = False):
         self.boost_version = boost_version
         self.boostdep_version = boostdep_version
         self.git_url = git_url
         self.tmppath = tmppath
         self.outputdir = outputdir
         self.unsafe = unsafe
+        self.worktree = worktree
+        self.force = force
+        self.incremental_submodules = incremental_submodules
+        self.shallow = shallow
+        self._fingerprint = None
 
     @property
     def boost_path(self) -> Path:
         return self.tmppath / "boost"
 
+    @property
+    def work_path(self) -> Path:
+        """
+        Checkout where this version is processed: a dedicated git worktree, or the boost clone itself.
+        """
+        if self.worktree:
+            return self.tmppath / "boost-worktrees" / self.boost_version
+        return self.boost_path
+
     def do_git_update(self) -> None:
         if not self.boost_path.exists():
             with tools.chdir(str(self.tmppath)):
@@ -134,8 +211,50 @@ class BoostDependencyBuilder(object):
                 print("Checking out current master")
                 subprocess.check_call(["git", "checkout", "origin/master"])
 
-    def do_git_submodule_update(self):
+    @property
+    def _fetch_url(self) -> str:
+        # A local mirror must be passed as url, git ignores --depth and --filter for plain local paths.
+        # The submodule urls of boost are relative, so they resolve to the mirrors next to it.
+        if Path(self.git_url).exists():
+            return Path(self.git_url).resolve().as_uri()
+        return self.git_url
+
+    @property
+    def _shallow_args(self) -> List[str]:
+        return ["--depth", "1", "--filter=blob:none"] if self.shallow else []
+
+    def do_git_update_shallow(self, boost_versions: List[str]) -> None:
+        """
+        Fetch only the boost-x.y.z tags, without history and with blobs fetched on demand.
+        The shallow repositories this leaves (also those of the submodules) are never used as --reference.
+        """
+        if not self.boost_path.exists():
+            print("Creating shallow boost git")
+            subprocess.check_call(["git", "init", str(self.boost_path)])
+            with tools.chdir(str(self.boost_path)):
+                subprocess.check_call(["git", "remote", "add", "origin", self._fetch_url])
         with tools.chdir(str(self.boost_path)):
+            print("Removing all local changes to git repo")
+            if subprocess.call(["git", "rev-parse", "--verify", "-q", "HEAD"], stdout=subprocess.DEVNULL) == 0:
+                subprocess.check_call(["git", "reset", "--hard", "HEAD"])
+            for boost_version in boost_versions:
+                print("Fetching boost-{}".format(boost_version))
+                subprocess.check_call(["git", "fetch", "--no-tags"] + self._shallow_args +
+                                      ["origin", "tag", "boost-{}".format(boost_version)])
+
+    def do_git_worktree_add(self) -> None:
+        if self.work_path.exists():
+            return
+        with tools.chdir(str(self.boost_path)):
+            print("Creating worktree for version {}".format(self.boost_version))
+            subprocess.check_call(["git", "worktree", "prune"])
+            subprocess.check_call(["git", "worktree", "add", "--detach", str(self.work_path.resolve()), "boost-{}".format(self.boost_version)])
+
+    def do_git_submodule_update(self):
+        if self.incremental_submodules:
+            self.do_git_submodule_update_incremental()
+            return
+        with tools.chdir(str(self.work_path)):
             if not self.unsafe:
                 # De-init + init to make sure that boostdep won't detect a new or removed boost library
                 print("De-init git submodules")
@@ -149,59 +268,184 @@ class BoostDependencyBuilder(object):
                 raise
 
             print("Re-init git submodules")
-            subprocess.check_call(["git", "submodule", "update", "--init"])
+            subprocess.check_call(["git", "submodule", "update", "--init"] + self._shallow_args)
 
             print("Removing unknown files/directories")
             subprocess.check_call(["git", "clean", "-d", "-f"])
 
-    def do_install_boostdep(self):
+    @staticmethod
+    def _submodule_commits(treeish: str) -> Dict[str, str]:
+        """
+        Map of submodule path to the commit it is pinned to in `treeish`.
+        """
+        commits = {}
+        for line in subprocess.check_output(["git", "ls-tree", "-r", treeish], text=True).splitlines():
+            info, path = line.split("\t", 1)
+            mode, kind, sha = info.split()
+            if kind == "commit":
+                commits[path] = sha
+        return commits
+
+    @property
+    def submodule_cache_path(self) -> Path:
+        """
+        Bare mirror of every submodule, whose objects the worktrees of all versions borrow.
+        """
+        return self.tmppath / "boost-submodules"
+
+    @staticmethod
+    def _submodule_names(treeish: str) -> Dict[str, str]:
+        """
+        Map of submodule path to submodule name in the .gitmodules of `treeish`.
+        """
+        names = {}
+        gitmodules_paths = subprocess.check_output(["git", "config", "--blob", "{}:.gitmodules".format(treeish),
+                                                    "--get-regexp", r"submodule\..*\.path"], text=True)
+        for line in gitmodules_paths.splitlines():
+            key, value = line.split(" ", 1)
+            names[value] = key[len("submodule."):-len(".path")]
+        return names
+
+    def _submodule_url(self, treeish: str, name: str) -> str:
+        url = subprocess.check_output(["git", "config", "--blob", "{}:.gitmodules".format(treeish),
+                                       "submodule.{}.url".format(name)], text=True).strip()
+        if not url.startswith(("./", "../")):
+            return url
+        # Relative urls are relative to the url of the boost repository, as `git submodule` resolves them
+        base = self._fetch_url.rstrip("/")
+        while url.startswith(("./", "../")):
+            if url.startswith("../"):
+                base = base.rsplit("/", 1)[0]
+            url = url.split("/", 1)[1]
+        return "{}/{}".format(base, url)
+
+    @staticmethod
+    def _is_shallow(git_dir: Path) -> bool:
+        return subprocess.check_output(["git", "--git-dir", str(git_dir), "rev-parse", "--is-shallow-repository"],
+                                       text=True).strip() == "true"
+
+    def do_git_submodule_cache_update(self, boost_versions: List[str], jobs: int = 1) -> None:
+        """
+        Mirror every submodule of the requested versions into `submodule_cache_path`, fetching only the mirrors that
+        miss a pinned commit, so that the worktrees check their submodules out without going to the network.
+        """
+        submodules = {}
         with tools.chdir(str(self.boost_path)):
+            for boost_version in boost_versions:
+                tag = "boost-{}".format(boost_version)
+                if subprocess.call(["git", "rev-parse", "--verify", "-q", tag], stdout=subprocess.DEVNULL) != 0:
+                    # Reported by the worktree of this version
+                    continue
+                names = self._submodule_names(tag)
+                for path, sha in self._submodule_commits(tag).items():
+                    name = names.get(path, path)
+                    url, shas = submodules.setdefault(name, (self._submodule_url(tag, name), set()))
+                    shas.add(sha)
+
+        def update(name: str, url: str, shas: set) -> None:
+            mirror = self.submodule_cache_path / name
+            if not mirror.exists():
+                mirror.parent.mkdir(parents=True, exist_ok=True)
+                subprocess.check_call(["git", "clone", "--quiet", "--mirror", "--", url, str(mirror)])
+            elif any(subprocess.call(["git", "--git-dir", str(mirror), "cat-file", "-e", "{}^{{commit}}".format(sha)],
+                                     stderr=subprocess.DEVNULL) != 0 for sha in shas):
+                subprocess.check_call(["git", "--git-dir", str(mirror), "fetch", "--quiet", "origin"])
+
+        print("Updating {} submodule mirrors in {}".format(len(submodules), self.submodule_cache_path))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            for future in [executor.submit(update, name, url, shas) for name, (url, shas) in sorted(submodules.items())]:
+                future.result()
+
+    def _submodule_reference(self, path: str) -> List[str]:
+        """
+        Borrow the objects of the submodule's mirror (see do_git_submodule_cache_update) when updating a worktree.
+        A shallow repository cannot be used as reference: shallow submodules (--shallow) are never mirrored nor used.
+        """
+        if not self.worktree or self.shallow:
+            return []
+        name = self._submodule_names("HEAD").get(path, path)
+        reference = self.submodule_cache_path / name
+        if not reference.is_dir() or self._is_shallow(reference):
+            return []
+        return ["--reference", str(reference.resolve())]
+
+    def do_git_submodule_update_incremental(self):
+        """
+        Check out only the submodules that changed between the current and the requested tag,
+        instead of de-initializing and re-initializing all of them.
+        """
+        with tools.chdir(str(self.work_path)):
+            if subprocess.call(["git", "rev-parse", "--verify", "-q", "HEAD"], stdout=subprocess.DEVNULL) == 0:
+                previous_commits = self._submodule_commits("HEAD")
+            else:
+                # Fresh shallow clone, nothing checked out yet
+                previous_commits = {}
+            try:
+                commits = self._submodule_commits("boost-{}".format(self.boost_version))
+            except subprocess.CalledProcessError:
+                print("version {} does not exist".format(self.boost_version))
+                raise
+
+            # Submodules not part of this version must disappear, or boostdep would detect them as boost libraries
+            for path in sorted(set(previous_commits).difference(commits)):
+                print("Removing submodule {}".format(path))
+                subprocess.check_call(["git", "submodule", "deinit", "-f", "--", path])
+                if Path(path).exists():
+                    shutil.rmtree(path)
+
+            print("Checking out version {}".format(self.boost_version))
+            subprocess.check_call(["git", "checkout", "boost-{}".format(self.boost_version)])
+
+            subprocess.check_call(["git", "submodule", "sync", "--quiet"])
+
+            changed = sorted(path for path, sha in commits.items()
+                             if previous_commits.get(path) != sha or not (Path(path) / ".git").exists())
+            print("Updating {} of {} submodules".format(len(changed), len(commits)))
+            for path in changed:
+                subprocess.check_call(["git", "submodule", "update", "--init"] + self._shallow_args +
+                                      self._submodule_reference(path) + ["--", path])
+
+            print("Removing unknown files/directories")
+            subprocess.check_call(["git", "clean", "-d", "-f"])
+
+            self._verify_libs_checkout(commits)
+
+    def _verify_libs_checkout(self, commits: Dict[str, str]) -> None:
+        """
+        Make sure that `libs` contains exactly the libraries of the checked out version.
+        """
+        tracked = set()
+        for line in subprocess.check_output(["git", "ls-tree", "HEAD", "libs/"], text=True).splitlines():
+            tracked.add(line.split("\t", 1)[1])
+        stale = sorted("libs/{}".format(d.name) for d in Path("libs").iterdir()
+                       if d.is_dir() and "libs/{}".format(d.name) not in tracked)
+        if stale:
+            raise Exception("Stale libraries in libs/ of {}: {}".format(self.boost_version, stale))
+        missing = sorted(path for path in commits if not (Path(path) / ".git").exists())
+        if missing:
+            raise Exception("Submodules not checked out for {}: {}".format(self.boost_version, missing))
+
+    def do_install_boostdep(self):
+        with tools.chdir(str(self.work_path)):
             print("Installing boostdep/{}".format(self.boostdep_version))
             subprocess.check_call(["conan", "install", "boostdep/{}@".format(self.boostdep_version), "-g", "json"])
 
     @property
     def _bin_paths(self):
-        with tools.chdir(str(self.boost_path)):
+        with tools.chdir(str(self.work_path)):
             data = json.loads(open("conanbuildinfo.json").read())
             return data["dependencies"][0]["bin_paths"]
 
-    _GREP_IGNORE_PREFIX = ("#", "\"")
-    _GREP_IGNORE_PARTS = ("boost", "<", ">")
-
-    @classmethod
-    def _grep_libs(cls, regex, text):
-        res = set()
-        for m in re.finditer(regex, text, flags=re.MULTILINE):
-            # If text before main capture group contains a string or a comment => ignore
-            ignore = False
-            for ign in cls._GREP_IGNORE_PREFIX:
-                if ign in m.group(1):
-                    ignore = True
-            if ignore:
-                continue
-            l = m.group(2).lower()
-            ignore = False
-            for ign in cls._GREP_IGNORE_PARTS:
-                if ign in l:
-                    ignore = True
-            if ignore:
-                continue
-            res.add(l)
-        return list(res)
-
     def _grep_requirements(self, component: str) -> List[str]:
-        jam = self.boost_path / "libs" / component / "build" / "Jamfile.v2"
+        jam = self.work_path / "libs" / component / "build" / "Jamfile.v2"
         if not jam.is_file():
-            jam = self.boost_path / "libs" / component / "build" / "Jamfile"
+            jam = self.work_path / "libs" / component / "build" / "Jamfile"
         if not jam.is_file():
             log.warning("Can't find Jamfile for %s. Unable to determine dependencies.", component)
             return []
-        contents = jam.open().read()
-
-        using = self._grep_libs("\n(.*)using\\s+([^ ;:]+)\\s*", contents)
-        libs = self._grep_libs("\n(.*)\\s(?:searched-)?lib\\s+([^ \t\n;:]+)", contents)
+        declarations = JamfileScanner.scan(jam)
 
-        requirements = using + libs
+        requirements = declarations.using + declarations.libs
         return requirements
 
     def _sort_requirements(self, requirements: List[str]) -> Tuple[List[str], Dict[str, List[str]], List[str]]:
@@ -227,7 +471,7 @@ class BoostDependencyBuilder(object):
         return list(conan_requirements), system_libs, list(unknown_libs)
 
     def do_boostdep_collect(self) -> BoostDependencies:
-        with tools.chdir(str(self.boost_path)):
+        with tools.chdir(str(self.work_path)):
             with tools.environment_append({"PATH": self._bin_paths}):
                 buildables = subprocess.check_output(["boostdep", "--list-buildable"], text=True)
                 buildables = buildables.splitlines()
@@ -342,13 +586,12 @@ class BoostDependencyBuilder(object):
 
         #  Look for the names of libraries in Jam build files
         for buildable in boost_dependencies.buildables:
-            construct_jam = lambda jam_ext : self.boost_path / "libs" / buildable / "build" / "Jamfile{}".format(jam_ext)
+            construct_jam = lambda jam_ext : self.work_path / "libs" / buildable / "build" / "Jamfile{}".format(jam_ext)
             try:
                 buildable_jam = next(construct_jam(jam_ext) for jam_ext in ("", ".v2") if construct_jam(jam_ext).is_file())
             except StopIteration:
                 raise Exception("Cannot find jam build file for {}".format(buildable))
-            jam_text = buildable_jam.read_text()
-            buildable_libs = re.findall("[ \n](boost-)?lib ([a-zA-Z0-9_]+)[ \n]", jam_text)
+            buildable_libs = JamfileScanner.scan(buildable_jam).boost_libs
             buildable_libs = set("boost_{}".format(lib) if lib_prefix else lib for lib_prefix, lib in buildable_libs)
             buildable_libs = set(l[len("boost_"):] for l in buildable_libs if l.startswith("boost_"))  # list(filter(lambda l: l.startswith("boost"), buildable_libs))
 
@@ -391,10 +634,60 @@ class BoostDependencyBuilder(object):
 
         return boost_dependencies
 
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash of everything the dependency file of this version is generated from.
+        """
+        if self._fingerprint is None:
+            with tools.chdir(str(self.boost_path)):
+                try:
+                    commit = subprocess.check_output(["git", "rev-parse", "--verify", "-q", "boost-{}^{{commit}}".format(self.boost_version)],
+                                                     text=True).strip()
+                except subprocess.CalledProcessError:
+                    print("version {} does not exist".format(self.boost_version))
+                    raise
+            inputs = {
+                "boost_commit": commit,
+                "boostdep_version": self.boostdep_version,
+                "configure_options": CONFIGURE_OPTIONS,
+                "conan_requirements": CONAN_REQUIREMENTS,
+                "unsafe": self.unsafe,
+            }
+            self._fingerprint = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+        return self._fingerprint
+
+    def is_up_to_date(self) -> bool:
+        if not self._outputpath.is_file():
+            return False
+        with self._outputpath.open() as fin:
+            data = yaml.safe_load(fin)
+        return data.get("fingerprint") == self.fingerprint
+
+    def do_dependency_file_update(self) -> str:
+        """
+        Run all steps needed to create the dependency file of this version. Used as unit of work by `-j`.
+        """
+        if not self.force and self.is_up_to_date():
+            print("{} is up to date, skipping {} (use --force to regenerate)".format(self._outputpath, self.boost_version))
+            if not dependency_index_is_current(self._outputpath, self._indexpath):
+                create_dependency_index(self._outputpath, self._indexpath)
+            return self.boost_version
+        if self.worktree:
+            self.do_git_worktree_add()
+        self.do_git_submodule_update()
+        self.do_install_boostdep()
+        self.do_create_dependency_file()
+        return self.boost_version
+
     @property
     def _outputpath(self) -> Path:
         return self.outputdir / "dependencies-{}.yml".format(self.boost_version)
 
+    @property
+    def _indexpath(self) -> Path:
+        return self.outputdir / "dependencies-{}.json".format(self.boost_version)
+
     @classmethod
     def _sort_item(cls, item):
         if isinstance(item, dict):
@@ -417,6 +710,7 @@ class BoostDependencyBuilder(object):
         tree.export.dependencies = self._fix_dependencies(tree.export.dependencies)
 
         data = dataclasses.asdict(tree.export)
+        data["fingerprint"] = self.fingerprint
         if self.unsafe:
             data["UNSAFE"] = "!DO NOT COMMIT! !THIS FILE IS GENERATED WITH THE UNSAFE OPTION ENABLED!"
 
@@ -426,16 +720,94 @@ class BoostDependencyBuilder(object):
         with self._outputpath.open("w") as fout:
             yaml.dump(data, fout)
 
+        create_dependency_index(self._outputpath, self._indexpath)
+
+
+def _compute_closures(tree: Dict[str, List[str]]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Compute, for every module, all modules it depends on and all modules depending on it (both including itself).
+    """
+    super_modules = {k: set() for k in tree}
+    for k, v in tree.items():
+        for d in v:
+            super_modules[d].add(k)
+
+    order = []
+    remaining = {k: set(v) for k, v in tree.items()}
+    ready = sorted(k for k, v in remaining.items() if not v)
+    while ready:
+        module = ready.pop()
+        order.append(module)
+        for s in super_modules[module]:
+            remaining[s].discard(module)
+            if not remaining[s]:
+                ready.append(s)
+    if len(order) != len(tree):
+        raise Exception("Dependency cycle detected. Remaining tree: {}".format(sorted(set(tree).difference(order))))
+
+    dependent = {}
+    for module in order:
+        dependent[module] = set([module]).union(*(dependent[d] for d in tree[module]))
+    supers = {}
+    for module in reversed(order):
+        supers[module] = set([module]).union(*(supers[s] for s in super_modules[module]))
+    return {k: sorted(v) for k, v in dependent.items()}, {k: sorted(v) for k, v in supers.items()}
+
+
+def create_dependency_index(yml_path: Path, index_path: Path) -> None:
+    """
+    Write the precompiled form of a dependencies-x.y.z.yml file, as loaded by `conanfile.py`.
+    The checksum of the yml file is stored, so the recipe can detect a stale index.
+    """
+    yml_contents = yml_path.read_bytes()
+    data = yaml.safe_load(yml_contents)
+    dependent_modules, super_modules = _compute_closures(data["dependencies"])
+    index = {
+        "format": DEPENDENCY_INDEX_FORMAT,
+        "yml_sha256": hashlib.sha256(yml_contents).hexdigest(),
+        "data": data,
+        "closures": {
+            "dependent_modules": dependent_modules,
+            "super_modules": super_modules,
+        },
+    }
+    print("Creating {}".format(index_path))
+    with index_path.open("w") as fout:
+        json.dump(index, fout, sort_keys=True, separators=(",", ":"))
+
+
+def dependency_index_is_current(yml_path: Path, index_path: Path) -> bool:
+    """
+    Whether the index of a dependencies-x.y.z.yml file exists, has the current format and matches the yml file.
+    """
+    try:
+        with index_path.open() as fin:
+            index = json.load(fin)
+    except (OSError, ValueError):
+        return False
+    return index.get("format") == DEPENDENCY_INDEX_FORMAT and \
+        index.get("yml_sha256") == hashlib.sha256(yml_path.read_bytes()).hexdigest()
+
 
 def main(args=None) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
     parser.add_argument("-t", dest="tmppath", help="temporary folder where to clone boost (default is system temporary folder)")
     parser.add_argument("-d", dest="boostdep_version", default="1.75.0", type=str, help="boostdep version")
-    parser.add_argument("-u", dest="git_url", default=BOOST_GIT_URL, help="boost git url")
+    parser.add_argument("-u", dest="git_url", default=BOOST_GIT_URL, help="boost git url, or path to a local (bare) mirror")
     parser.add_argument("-U", dest="git_update", action="store_true", help="update the git repo")
+    parser.add_argument("--shallow", dest="shallow", action="store_true",
+                        help="only fetch the tags of the requested versions, without history and blobs (also for submodules)")
     parser.add_argument("-o", dest="outputdir", default=None, type=Path, help="output dependency dir")
     parser.add_argument("-x", dest="unsafe", action="store_true", help="unsafe fast(er) operation")
+    parser.add_argument("-j", dest="jobs", default=1, type=int,
+                        help="number of versions to process in parallel, each in its own git worktree")
+    parser.add_argument("-s", dest="incremental_submodules", action="store_true",
+                        help="only update submodules that changed between versions, instead of de-init + init of all of them "
+                             "(with -j, the worktrees borrow the objects of bare submodule mirrors in the temporary folder)")
+    parser.add_argument("--force", dest="force", action="store_true",
+                        help="regenerate dependency files, even if their fingerprint is up to date")
+    parser.add_argument("-I", dest="index_only", action="store_true", help="only regenerate the json indexes of existing yml files")
 
     version_group = parser.add_mutually_exclusive_group(required=True)
     version_group.add_argument("-v", dest="boost_version", help="boost version")
@@ -463,8 +835,14 @@ def main(args=None) -> int:
     else:
         boost_versions = [ns.boost_version]
 
+    if ns.index_only:
+        for boost_version in boost_versions:
+            create_dependency_index(ns.outputdir / "dependencies-{}.yml".format(boost_version),
+                                    ns.outputdir / "dependencies-{}.json".format(boost_version))
+        return 0
+
+    boost_collectors = []
     for boost_version in boost_versions:
-        print("Starting {}".format(boost_version))
         boost_collector = BoostDependencyBuilder(
             boost_version=boost_version,
             boostdep_version=ns.boostdep_version,
@@ -472,6 +850,10 @@ def main(args=None) -> int:
             outputdir=ns.outputdir,
             tmppath=ns.tmppath,
             unsafe=ns.unsafe,
+            worktree=ns.jobs > 1,
+            force=ns.force,
+            incremental_submodules=ns.incremental_submodules,
+            shallow=ns.shallow,
         )
 
         if not ns.git_update and not boost_collector.boost_path.exists():
@@ -479,14 +861,37 @@ def main(args=None) -> int:
             return 1
 
         if ns.git_update and not git_update_done:
-            boost_collector.do_git_update()
+            if ns.shallow:
+                boost_collector.do_git_update_shallow(boost_versions)
+            else:
+                boost_collector.do_git_update()
             git_update_done = True
 
-        boost_collector.do_git_submodule_update()
-
-        boost_collector.do_install_boostdep()
+        boost_collectors.append(boost_collector)
+
+    if ns.jobs > 1 and ns.incremental_submodules and not ns.shallow:
+        boost_collectors[0].do_git_submodule_cache_update(boost_versions, jobs=ns.jobs)
+
+    if ns.jobs > 1:
+        # Each version has its own worktree, sharing the object store of the boost clone (and with -s, of the submodule mirrors)
+        failed = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=ns.jobs) as executor:
+            futures = {executor.submit(boost_collector.do_dependency_file_update): boost_collector.boost_version
+                       for boost_collector in boost_collectors}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    print("Finished {}".format(future.result()))
+                except Exception as e:
+                    log.error("Creating dependencies of %s failed: %s", futures[future], e)
+                    failed.append(futures[future])
+        if failed:
+            log.error("Failed versions: %s", ", ".join(sorted(failed)))
+            return 1
+        return 0
 
-        boost_collector.do_create_dependency_file()
+    for boost_collector in boost_collectors:
+        print("Starting {}".format(boost_collector.boost_version))
+        boost_collector.do_dependency_file_update()
     return 0
 
 
@@ -0,0 +1,46 @@
+import importlib.util
+import io
+import os
+
+import conans
+import pytest
+
+RECIPE_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@pytest.fixture(scope="session")
+def recipe():
+    # The recipe pulls its build helper through python_requires, which only resolves inside a conan command
+    conans.python_requires = lambda reference: None
+    try:
+        spec = importlib.util.spec_from_file_location("boost_conanfile", os.path.join(RECIPE_FOLDER, "conanfile.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        del conans.python_requires
+    return module
+
+
+@pytest.fixture
+def data_file():
+    return lambda name: os.path.join(DATA_FOLDER, name)
+
+
+@pytest.fixture
+def conanfile(recipe, tmp_path):
+    from conans.client.output import ConanOutput
+
+    conanfile = recipe.BoostConan(ConanOutput(io.StringIO()), None, display_name="boost/1.0")
+    build_folder = tmp_path / "build"
+    build_folder.mkdir()
+    conanfile.folders.set_base_build(str(build_folder))
+    return conanfile
+
+
+@pytest.fixture(scope="session")
+def rebuild_dependencies():
+    spec = importlib.util.spec_from_file_location("rebuild_dependencies", os.path.join(RECIPE_FOLDER, "rebuild-dependencies.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,38 @@
+# data/b2-4.3-out.xml is the --out-xml of a b2 4.3 (gcc 12, link=static, -j1) build of two libraries: libs/demo
+# (src/a.cpp, src/b.cpp archived into libboost_demo.a) and libs/broken (src/c.cpp, which does not compile).
+
+
+def test_parse_b2_xml_actions(recipe, data_file):
+    actions = recipe.parse_b2_xml(data_file("b2-4.3-out.xml"))
+    assert len(actions) == 15
+    assert all(action["target"] for action in actions)
+    assert {action["library"] for action in actions} == {"demo", "broken"}
+
+    compiles = [action for action in actions if action["name"] == "gcc%gcc.compile.c++"]
+    assert [(action["target"], action["sources"]) for action in compiles] == [
+        ("libs/demo/bin/gcc-12/debug/link-static/src/a.o", ["libs/demo/src/a.cpp"]),
+        ("libs/demo/bin/gcc-12/debug/link-static/src/b.o", ["libs/demo/src/b.cpp"]),
+        ("libs/broken/bin/gcc-12/debug/link-static/src/c.o", ["libs/broken/src/c.cpp"]),
+    ]
+    assert [action["status"] for action in compiles] == ["0", "0", "1"]
+    assert all(action["start"] is not None and action["end"] >= action["start"] for action in actions)
+
+    archive = next(action for action in actions if action["name"] == "gcc%gcc.archive")
+    assert archive["target"] == "libs/demo/bin/gcc-12/debug/link-static/libboost_demo.a"
+
+
+def test_b2_timing_report(recipe, data_file):
+    report, trace = recipe.b2_timing_report(recipe.parse_b2_xml(data_file("b2-4.3-out.xml")))
+    assert report["actions"] == 15
+    assert report["failed_actions"] == ["libs/broken/bin/gcc-12/debug/link-static/src/c.o"]
+    assert {library["name"] for library in report["libraries"]} == {"demo", "broken"}
+    assert sorted(unit["source"] for unit in report["slowest_translation_units"]) == [
+        "libs/broken/src/c.cpp", "libs/demo/src/a.cpp", "libs/demo/src/b.cpp"]
+    assert len(trace["traceEvents"]) == 15
+    assert "libboost_demo.a" in {event["name"] for event in trace["traceEvents"]}
+
+
+def test_b2_grist_path(recipe):
+    assert recipe._b2_grist_path("<plibs/log>src/core.cpp") == "libs/log/src/core.cpp"
+    assert recipe._b2_grist_path("<p>boost/config.hpp") == "boost/config.hpp"
+    assert recipe._b2_grist_path("plain/path.cpp") == "plain/path.cpp"
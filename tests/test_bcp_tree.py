@@ -0,0 +1,97 @@
+import os
+import types
+
+
+def _write(path, contents):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(contents)
+
+
+def _read_tree(folder):
+    tree = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            with open(os.path.join(root, name)) as f:
+                tree[os.path.relpath(os.path.join(root, name), folder)] = f.read()
+    return tree
+
+
+def test_sync_tree(recipe, tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    for folder, files in [(src, {"same.hpp": "same", "changed.hpp": "new", "sub/added.hpp": "added"}),
+                          (dst, {"same.hpp": "same", "changed.hpp": "old", "gone/removed.hpp": "removed"})]:
+        for name, contents in files.items():
+            _write(str(folder / name), contents)
+    old = 1_000_000_000
+    for name in ("same.hpp", "changed.hpp"):
+        os.utime(src / name, ns=(old, old))
+        os.utime(dst / name, ns=(old, old))
+
+    assert recipe.sync_tree(str(src), str(dst)) == 3
+    assert _read_tree(dst) == _read_tree(src)
+    assert not (dst / "gone").exists()
+    assert os.stat(dst / "same.hpp").st_mtime_ns == old
+    # A changed file must look newer than what b2 built from its previous contents
+    assert os.stat(dst / "changed.hpp").st_mtime_ns > old
+
+
+def test_incremental_bcp_tree(conanfile, monkeypatch):
+    runs = []
+    key = {"value": "a"}
+    contents = {"boost/config.hpp": "config", "libs/system/src/error_code.cpp": "v1"}
+
+    def run_bcp(destination):
+        runs.append(destination)
+        for name, text in contents.items():
+            _write(os.path.join(destination, name), text)
+
+    conanfile.folders.set_base_source(conanfile.build_folder)
+    conanfile.options = types.SimpleNamespace(incremental=True)
+    monkeypatch.setattr(type(conanfile), "_bcp_dir", "custom-boost")
+    monkeypatch.setattr(type(conanfile), "_bcp_cache_folder", None)
+    monkeypatch.setattr(type(conanfile), "_bcp_tree_cache_key", property(lambda self: key["value"]))
+    monkeypatch.setattr(conanfile, "_build_bcp", lambda: None)
+    monkeypatch.setattr(conanfile, "_run_bcp", run_bcp)
+    bcp_dir = os.path.join(conanfile.source_folder, "custom-boost")
+
+    conanfile._prepare_bcp_tree()
+    assert runs == [bcp_dir]
+    old = 1_000_000_000
+    for name in contents:
+        os.utime(os.path.join(bcp_dir, name), ns=(old, old))
+
+    # Same key: neither bcp nor any copy
+    conanfile._prepare_bcp_tree()
+    assert runs == [bcp_dir]
+
+    # New key: only the changed file is touched
+    key["value"] = "b"
+    contents["libs/system/src/error_code.cpp"] = "v2"
+    conanfile._prepare_bcp_tree()
+    assert runs == [bcp_dir, bcp_dir + ".new"]
+    assert not os.path.exists(bcp_dir + ".new")
+    assert _read_tree(bcp_dir) == contents
+    assert os.stat(os.path.join(bcp_dir, "boost", "config.hpp")).st_mtime_ns == old
+    assert os.stat(os.path.join(bcp_dir, "libs", "system", "src", "error_code.cpp")).st_mtime_ns > old
+
+
+def test_bcp_runs_once_for_every_library(conanfile, monkeypatch):
+    conanfile.folders.set_base_source(conanfile.build_folder)
+    conanfile.options = types.SimpleNamespace(namespace="myboost", namespace_alias=True)
+    monkeypatch.setattr(type(conanfile), "_source_subfolder", "src")
+    monkeypatch.setattr(type(conanfile), "_is_msvc", False)
+    monkeypatch.setattr(type(conanfile), "_is_clang_cl", False)
+    monkeypatch.setattr(type(conanfile), "_bcp_exe", "bcp")
+    for name in ("boost/asio/io_context.hpp", "boost/config/user.hpp", "boost/version.hpp",
+                 "libs/system/src/error_code.cpp", "libs/asio/index.html"):
+        _write(os.path.join(conanfile.source_folder, "src", name), "")
+    commands = []
+    monkeypatch.setattr(conanfile, "run", lambda command: commands.append(command))
+
+    destination = os.path.join(conanfile.source_folder, "myboost")
+    conanfile._run_bcp(destination)
+
+    assert commands == [f"bcp --namespace=myboost --namespace-alias --boost=src asio boost-build.jam boost_install "
+                        f"boostcpp.jam build config headers system {destination}"]
+    assert os.path.isdir(destination)
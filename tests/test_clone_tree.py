@@ -0,0 +1,64 @@
+import os
+import types
+
+import pytest
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "detail").mkdir(parents=True)
+    (src / "config.hpp").write_text("config")
+    (src / "detail" / "impl.hpp").write_text("impl")
+    return src
+
+
+def _fail(src, dst):
+    raise OSError("not supported")
+
+
+def _shares_inode(a, b):
+    return os.stat(a).st_ino == os.stat(b).st_ino
+
+
+def test_clone_tree_falls_back_to_hardlinks(recipe, tree, tmp_path, monkeypatch):
+    monkeypatch.setattr(recipe, "_reflink_file", _fail)
+
+    assert recipe.clone_tree(str(tree), str(tmp_path / "dst")) == "hardlink"
+    assert _shares_inode(tree / "detail" / "impl.hpp", tmp_path / "dst" / "detail" / "impl.hpp")
+
+
+def test_clone_tree_falls_back_to_copies(recipe, tree, tmp_path, monkeypatch):
+    monkeypatch.setattr(recipe, "_reflink_file", _fail)
+    monkeypatch.setattr(recipe, "_link_file", _fail)
+
+    assert recipe.clone_tree(str(tree), str(tmp_path / "dst")) == "copy"
+    assert (tmp_path / "dst" / "detail" / "impl.hpp").read_text() == "impl"
+
+
+def test_clone_tree_without_hardlinks_copies(recipe, tree, tmp_path, monkeypatch):
+    monkeypatch.setattr(recipe, "_reflink_file", _fail)
+    link_file = []
+    monkeypatch.setattr(recipe, "_link_file", lambda src, dst: link_file.append(src))
+
+    assert recipe.clone_tree(str(tree), str(tmp_path / "dst"), allow_hardlinks=False) == "copy"
+    assert link_file == []
+    assert not _shares_inode(tree / "config.hpp", tmp_path / "dst" / "config.hpp")
+
+
+def test_packaged_headers_do_not_share_the_source_files(conanfile, recipe, tmp_path, monkeypatch):
+    source_folder = tmp_path / "source"
+    (source_folder / "src" / "boost").mkdir(parents=True)
+    (source_folder / "src" / "boost" / "version.hpp").write_text("#define BOOST_VERSION 108000")
+    conanfile.folders.set_base_source(str(source_folder))
+    conanfile.folders.set_base_package(str(tmp_path / "package"))
+    conanfile.options = types.SimpleNamespace(layout="system", header_only=True)
+    monkeypatch.setattr(type(conanfile), "_boost_dir", "src")
+    monkeypatch.setattr(recipe, "_reflink_file", _fail)
+    monkeypatch.setattr(recipe, "build_jobs", lambda conanfile: 1)
+
+    conanfile._package_headers()
+
+    packaged = tmp_path / "package" / "include" / "boost" / "version.hpp"
+    assert packaged.read_text() == "#define BOOST_VERSION 108000"
+    assert not _shares_inode(source_folder / "src" / "boost" / "version.hpp", packaged)
@@ -0,0 +1,74 @@
+import os
+import sys
+
+
+def _touch(path, contents="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(contents)
+
+
+def test_seed_worker_build_dir(conanfile, tmp_path):
+    workers = tmp_path / "workers"
+    system = workers / "system" / "build"
+    _touch(str(system / "boost" / "bin.v2" / "libs" / "system" / "build" / "system.o"))
+    _touch(str(system / "boost" / "bin.v2" / "config.log"), "system")
+    _touch(str(system / "boost" / "bin.v2" / "project-cache.jam"), "system")
+    # left by a previous build of the shared build dir
+    _touch(os.path.join(conanfile.build_folder, "boost", "bin.v2", "libs", "filesystem", "build", "path.o"))
+    _touch(os.path.join(conanfile.build_folder, "boost", "bin.v2", "libs", "atomic", "build", "lockpool.o"))
+
+    build_dir = str(workers / "filesystem" / "build")
+    conanfile._seed_worker_build_dir(build_dir, [str(system), str(workers / "missing" / "build")], "filesystem")
+
+    seeded = sorted(os.path.relpath(os.path.join(root, name), build_dir)
+                    for root, _, names in os.walk(build_dir) for name in names)
+    assert seeded == sorted(os.path.join("boost", "bin.v2", *parts) for parts in [
+        ("config.log",), ("project-cache.jam",), ("libs", "system", "build", "system.o"),
+        ("libs", "filesystem", "build", "path.o")])
+    source_object = system / "boost" / "bin.v2" / "libs" / "system" / "build" / "system.o"
+    seeded_object = os.path.join(build_dir, "boost", "bin.v2", "libs", "system", "build", "system.o")
+    assert os.stat(seeded_object).st_mtime_ns == os.stat(source_object).st_mtime_ns
+    for name in ("config.log", "project-cache.jam", os.path.join("libs", "system", "build", "system.o")):
+        assert not os.path.samefile(os.path.join(build_dir, "boost", "bin.v2", name), system / "boost" / "bin.v2" / name)
+    # a target rewritten in place by the library's run leaves the dependency's build dir alone
+    with open(seeded_object, "w") as f:
+        f.write("rewritten")
+    assert source_object.read_text() == "x"
+
+
+def test_b2_command_build_dir(conanfile):
+    conanfile._cached_toolchain = {"b2": "b2"}
+    assert f'--build-dir="{conanfile.build_folder}"' in conanfile._b2_command(["-j1"])
+    assert '--build-dir="/tmp/worker"' in conanfile._b2_command(["-j1"], "system", build_dir="/tmp/worker")
+
+
+def _b2_stand_in(tmp_path, first_output, then_output=None):
+    """
+    :return: command failing with first_output on its first run, then failing with then_output, or succeeding
+    """
+    script = tmp_path / "b2.py"
+    script.write_text(
+        "import os, sys\n"
+        f"runs = {str(tmp_path / 'runs')!r}\n"
+        "first = not os.path.exists(runs)\n"
+        "open(runs, 'a').write('x')\n"
+        f"output = {first_output!r} if first else {then_output!r}\n"
+        "if output:\n"
+        "    print(output)\n"
+        "    sys.exit(1)\n")
+    return f'"{sys.executable}" "{script}"'
+
+
+def test_transient_library_failure_is_retried(conanfile, tmp_path):
+    command = _b2_stand_in(tmp_path, "g++: fatal error: Killed signal terminated program cc1plus")
+    result = conanfile._run_b2_library(command, str(tmp_path / "log.log"))
+    assert (result["status"], result["attempts"]) == ("built", 2)
+    assert (tmp_path / "log.log").read_text().count("# attempt") == 2
+
+
+def test_library_compile_error_is_not_retried(conanfile, tmp_path):
+    error = "libs/log/src/core.cpp:12:1: error: expected ';' before '}' token"
+    result = conanfile._run_b2_library(_b2_stand_in(tmp_path, error, error), str(tmp_path / "log.log"))
+    assert (result["status"], result["attempts"]) == ("failed", 1)
+    assert (tmp_path / "runs").read_text() == "x"
@@ -0,0 +1,117 @@
+import io
+import json
+import sys
+import types
+
+import pytest
+
+
+class _Options:
+    def __init__(self, **values):
+        self._values = values
+
+    def get_safe(self, name, default=None):
+        return self._values.get(name, default)
+
+
+def test_available_memory_from_proc_meminfo(recipe, monkeypatch):
+    monkeypatch.setattr(recipe, "psutil", None)
+    meminfo = "MemTotal:       16318412 kB\nMemFree:         1203040 kB\nMemAvailable:    8388608 kB\n"
+    monkeypatch.setattr(recipe, "open", lambda path, encoding=None: io.StringIO(meminfo), raising=False)
+    assert recipe.available_memory_mib() == 8192
+
+    def no_meminfo(path, encoding=None):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(recipe, "open", no_meminfo, raising=False)
+    assert recipe.available_memory_mib() is None
+
+
+def test_available_memory_from_psutil(recipe, monkeypatch):
+    virtual_memory = types.SimpleNamespace(available=3 * 1024 * 1024 * 1024)
+    monkeypatch.setattr(recipe, "psutil", types.SimpleNamespace(virtual_memory=lambda: virtual_memory))
+    assert recipe.available_memory_mib() == 3072
+
+
+@pytest.mark.parametrize("available, memory_per_job, jobs", [
+    (None, 2560, 16),  # unknown: as many jobs as configured
+    (65536, 512, 16),  # never more jobs than configured
+    (8192, 2560, 2),  # 8192 * 0.9 // (2560 * 1.2)
+    (1024, 2560, 1),  # at least one job
+])
+def test_jobs_are_capped_by_available_memory(conanfile, recipe, monkeypatch, available, memory_per_job, jobs):
+    monkeypatch.setattr(recipe, "build_jobs", lambda conanfile: 16)
+    monkeypatch.setattr(recipe, "available_memory_mib", lambda: available)
+    assert conanfile._memory_capped_jobs(memory_per_job) == jobs
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="peak memory is only measured on POSIX")
+def test_memory_estimates_are_calibrated(conanfile, recipe, tmp_path, monkeypatch):
+    monkeypatch.setenv("CONAN_BOOST_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(recipe, "build_jobs", lambda conanfile: 16)
+    monkeypatch.setattr(recipe, "available_memory_mib", lambda: 16384)
+    monkeypatch.setattr(type(conanfile), "_toolset_tag", "gcc12")
+    monkeypatch.setattr(type(conanfile), "_built_modules", ["log", "system", "wave"])
+    monkeypatch.setattr(conanfile, "_get_build_flags", lambda jobs=None, libraries=None: [f"-j{jobs}"] + (libraries or []))
+    peaks = {"log": "3000", "wave": "100"}
+    passes = []
+
+    def run_b2(b2_flags, name=None, rusage_file=None):
+        passes.append(b2_flags)
+        if rusage_file:
+            with open(rusage_file, "w") as f:
+                f.write(peaks[name])
+
+    monkeypatch.setattr(conanfile, "_run_b2", run_b2)
+
+    conanfile._run_memory_aware_b2(["-j16"])
+    # log: 16384 * 0.9 // (2560 * 1.2), wave: 16384 * 0.9 // (2048 * 1.2)
+    assert passes == [["-j4", "log"], ["-j6", "wave"], ["-j16"]]
+    with open(tmp_path / "cache" / "memory-estimates.json") as f:
+        # a peak below one light job means nothing was compiled: wave keeps its estimate
+        assert json.load(f) == {"gcc12/log": 3000}
+
+    passes.clear()
+    conanfile._run_memory_aware_b2(["-j16"])
+    # 16384 * 0.9 // (3000 * 1.2)
+    assert passes[0] == ["-j4", "log"]
+    peaks["log"] = "4000"
+    passes.clear()
+    conanfile._run_memory_aware_b2(["-j16"])
+    with open(tmp_path / "cache" / "memory-estimates.json") as f:
+        assert json.load(f) == {"gcc12/log": 4000}
+    passes.clear()
+    conanfile._run_memory_aware_b2(["-j16"])
+    # 16384 * 0.9 // (4000 * 1.2)
+    assert passes[0] == ["-j3", "log"]
+
+
+def test_rusage_wrapper_runs_with_a_python_interpreter(conanfile, recipe, monkeypatch):
+    conanfile.options = _Options()
+    assert conanfile._rusage_python == sys.executable
+
+    # frozen conan installers: sys.executable is the conan binary
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(recipe.tools, "which", lambda name: "/usr/bin/python3" if name == "python3" else None)
+    assert conanfile._rusage_python == "/usr/bin/python3"
+    conanfile.options = _Options(python_executable="/opt/python/bin/python3.11")
+    assert conanfile._rusage_python == "/opt/python/bin/python3.11"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="peak memory is only measured on POSIX")
+def test_peak_memory_without_python_interpreter(conanfile, recipe, tmp_path, monkeypatch):
+    monkeypatch.setattr(type(conanfile), "_rusage_python", None)
+    monkeypatch.setattr(conanfile, "_b2_command", lambda b2_flags, name=None: "b2 " + " ".join(b2_flags))
+    peaks = iter([1000, 3000, 3000, 3000])
+    monkeypatch.setattr(recipe, "children_peak_memory_mib", lambda: next(peaks))
+    commands = []
+    monkeypatch.setattr(conanfile, "run", lambda command, run_environment=False: commands.append(command))
+
+    rusage_file = tmp_path / "rusage.txt"
+    conanfile._run_b2(["-j4"], name="log", rusage_file=str(rusage_file))
+    assert commands == ["b2 -j4"]
+    assert rusage_file.read_text() == "3000"
+    # no new maximum: the peak of this pass is unknown
+    conanfile._run_b2(["-j4"], name="log", rusage_file=str(rusage_file))
+    assert rusage_file.read_text() == "0"
+
@@ -0,0 +1,94 @@
+import os
+
+from conans.model.build_info import CppInfo
+
+
+def test_variant_components(conanfile, tmp_path, monkeypatch):
+    package_folder = tmp_path / "package"
+    for folder, names in [("lib", ["libboost_atomic.a", "libboost_filesystem.a", "libboost_exception.a"]),
+                          ("lib/shared_release", ["libboost_atomic.so", "libboost_filesystem.so"])]:
+        os.makedirs(package_folder / folder)
+        for name in names:
+            (package_folder / folder / name).write_text("")
+    conanfile.folders.set_base_package(str(package_folder))
+    conanfile.cpp_info = CppInfo("boost", str(package_folder))
+    conanfile._cached_dependencies = {"libs": {"atomic": ["boost_atomic"], "exception": ["boost_exception"],
+                                               "filesystem": ["boost_filesystem"], "system": ["boost_system"]}}
+    monkeypatch.setattr(type(conanfile), "_build_variant", ("static", "release"))
+
+    components = conanfile.cpp_info.components
+    components["atomic"].libs = ["boost_atomic"]
+    components["atomic"].requires = ["_libboost"]
+    components["atomic"].system_libs = ["atomic"]
+    components["exception"].libs = ["boost_exception"]
+    components["exception"].requires = ["_libboost"]
+    components["system"].libs = []
+    components["system"].requires = ["_libboost"]
+    components["filesystem"].libs = ["boost_filesystem"]
+    components["filesystem"].requires = ["atomic", "system", "_libboost", "zlib::zlib"]
+    components["filesystem"].defines = ["BOOST_NO_RTTI"]
+
+    conanfile._add_variant_components("shared", "release", ["atomic", "exception", "system", "filesystem"],
+                                      lambda names, link, variant: list(names))
+
+    filesystem = components["variant_shared_release_filesystem"]
+    assert filesystem.libs == ["boost_filesystem"]
+    assert filesystem.requires == ["variant_shared_release_atomic", "variant_shared_release_system",
+                                   "variant_shared_release_libboost", "zlib::zlib"]
+    assert filesystem.defines == ["BOOST_NO_RTTI"]
+    assert components["variant_shared_release_dynamic_linking"].defines == ["BOOST_ALL_DYN_LINK"]
+    # always static libraries of the same build type are in lib
+    assert filesystem.libdirs == [os.path.join("lib", "shared_release"), "lib"]
+    assert components["variant_shared_release_atomic"].system_libs == ["atomic"]
+    assert components["variant_shared_release_system"].libs == []
+    assert components["variant_shared_release"].requires == [
+        "variant_shared_release_atomic", "variant_shared_release_exception", "variant_shared_release_system",
+        "variant_shared_release_filesystem"]
+    assert components["variant_shared_release"].libs == []
+
+
+def test_static_variant_of_shared_package(conanfile, tmp_path, monkeypatch):
+    package_folder = tmp_path / "package"
+    for folder, names in [("lib", ["libboost_python311.so"]), ("lib/static_release", ["libboost_python311.a"])]:
+        os.makedirs(package_folder / folder)
+        for name in names:
+            (package_folder / folder / name).write_text("")
+    conanfile.folders.set_base_package(str(package_folder))
+    conanfile.cpp_info = CppInfo("boost", str(package_folder))
+    conanfile._cached_dependencies = {"libs": {"python": ["boost_python311"]}}
+    monkeypatch.setattr(type(conanfile), "_build_variant", ("shared", "release"))
+
+    components = conanfile.cpp_info.components
+    components["dynamic_linking"].defines = ["BOOST_ALL_DYN_LINK"]
+    components["disable_autolinking"].defines = ["BOOST_ALL_NO_LIB"]
+    components["headers"].requires = ["disable_autolinking", "dynamic_linking"]
+    components["headers"].defines = ["BOOST_FILESYSTEM_VERSION=3"]
+    components["_libboost"].requires = ["headers"]
+    components["_libboost"].system_libs = ["rt", "pthread"]
+    components["python"].libs = ["boost_python311"]
+    components["python"].requires = ["_libboost"]
+
+    conanfile._add_variant_components("static", "release", ["python"], lambda names, link, variant: list(names))
+
+    python = components["variant_static_release_python"]
+    assert python.requires == ["variant_static_release_libboost"]
+    assert python.defines == ["BOOST_PYTHON_STATIC_LIB"]
+    assert components["variant_static_release_libboost"].requires == ["variant_static_release_headers"]
+    assert components["variant_static_release_libboost"].system_libs == ["rt", "pthread"]
+    headers = components["variant_static_release_headers"]
+    assert headers.requires == ["disable_autolinking", "variant_static_release_dynamic_linking"]
+    assert headers.defines == ["BOOST_FILESYSTEM_VERSION=3"]
+    assert components["variant_static_release_dynamic_linking"].defines == []
+    # the configured variant keeps its defines
+    assert components["dynamic_linking"].defines == ["BOOST_ALL_DYN_LINK"]
+
+    # no define of the variant's components says dynamic linking
+    def all_defines(name):
+        component = components[name]
+        defines = list(component.defines)
+        for requirement in component.requires:
+            defines += all_defines(requirement)
+        return defines
+
+    assert "BOOST_ALL_DYN_LINK" not in all_defines("variant_static_release")
+    assert "BOOST_ALL_NO_LIB" in all_defines("variant_static_release")
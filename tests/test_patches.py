@@ -0,0 +1,103 @@
+import logging
+import threading
+
+import pytest
+
+
+def _patch(filename, old, new):
+    return {"patch_description": f"{filename}: {old} -> {new}",
+            "patch_string": f"--- a/{filename}\n+++ b/{filename}\n@@ -1 +1 @@\n-{old}\n+{new}\n"}
+
+
+def test_patches_sharing_a_file_are_grouped(recipe, tmp_path):
+    patches = [_patch("a.txt", "1", "2"), _patch("b.txt", "1", "2"), _patch("a.txt", "2", "3"), _patch("c.txt", "1", "2")]
+    plan = recipe.PatchPlan(patches, str(tmp_path))
+
+    assert plan.groups == [[0, 2], [1], [3]]
+    assert plan.conflicts == {"a.txt": ["a.txt: 1 -> 2", "a.txt: 2 -> 3"]}
+
+
+def test_patches_are_applied_in_order(conanfile, recipe, tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("1\n")
+    plan = recipe.PatchPlan([_patch("a.txt", "1", "2"), _patch("b.txt", "1", "2"), _patch("a.txt", "2", "3")], str(tmp_path))
+
+    plan.apply(str(tmp_path), conanfile.output, jobs=2)
+
+    assert (tmp_path / "a.txt").read_text() == "3\n"
+    assert (tmp_path / "b.txt").read_text() == "2\n"
+
+
+def test_failures_of_every_group_are_reported(conanfile, recipe, tmp_path, monkeypatch):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text("1\n")
+    plan = recipe.PatchPlan([_patch("a.txt", "5", "6"), _patch("b.txt", "7", "8"), _patch("c.txt", "1", "2")],
+                            str(tmp_path))
+    # both failing groups are running when the first one fails
+    started = threading.Barrier(2)
+    apply_patchset = recipe.PatchPlan._apply_patchset
+
+    def apply_after_barrier(patchset, root):
+        if b"c.txt" not in patchset.items[0].target:
+            started.wait(timeout=10)
+        return apply_patchset(patchset, root)
+
+    monkeypatch.setattr(recipe.PatchPlan, "_apply_patchset", staticmethod(apply_after_barrier))
+
+    with pytest.raises(recipe.ConanException) as error:
+        plan.apply(str(tmp_path), conanfile.output, jobs=2)
+    report = str(error.value)
+    assert report.startswith("Failed to apply patches:")
+    assert "\n  a.txt: 5 -> 6:\n    " in report
+    assert "\n  b.txt: 7 -> 8:\n    " in report
+    assert "c.txt" not in report
+
+
+def test_log_collector_keeps_messages_per_thread(recipe):
+    collector = recipe._PatchLogCollector()
+    logger = logging.getLogger("test_patches")
+    logger.addHandler(collector)
+    try:
+        thread = threading.Thread(target=logger.warning, args=("from the thread",))
+        thread.start()
+        thread.join()
+        logger.warning("from the main thread")
+        logger.info("ignored")
+    finally:
+        logger.removeHandler(collector)
+
+    assert collector.pop() == ["from the main thread"]
+    assert collector.pop() == []
+    assert collector.messages == {thread.ident: ["from the thread"]}
+
+
+def test_patch_verdicts_round_trip(conanfile, recipe, tmp_path, monkeypatch):
+    monkeypatch.setenv("CONAN_BOOST_CACHE_DIR", str(tmp_path / "cache"))
+    patch = _patch("a.txt", "1", "2")
+    conanfile.version = "1.80.0"
+    conanfile.conan_data = {"sources": {"1.80.0": {"sha256": "0" * 64}}, "patches": {"1.80.0": [patch]}}
+    key = conanfile._source_key(str(tmp_path))
+
+    # unknown verdict
+    conanfile._check_patch_verdict(str(tmp_path))
+
+    conanfile._save_patch_verdict(key, "a.txt: 1 -> 2:\n    failed")
+    with pytest.raises(recipe.ConanException, match="known not to apply:\na.txt: 1 -> 2:"):
+        conanfile._check_patch_verdict(str(tmp_path))
+
+    conanfile._save_patch_verdict(key, None)
+    conanfile._check_patch_verdict(str(tmp_path))
+    assert "known to apply cleanly" in conanfile.output._stream.getvalue()
+
+    # another patch is another source tree
+    conanfile.conan_data["patches"]["1.80.0"] = [_patch("a.txt", "1", "3")]
+    assert conanfile._source_key(str(tmp_path)) != key
+
+
+@pytest.mark.parametrize("conan_data", [None, {"sources": {"1.79.0": {"sha256": "0" * 64}}}])
+def test_patch_verdict_of_unknown_version_is_not_checked(conanfile, tmp_path, monkeypatch, conan_data):
+    monkeypatch.setenv("CONAN_BOOST_CACHE_DIR", str(tmp_path / "cache"))
+    conanfile.version = "1.80.0"
+    conanfile.conan_data = conan_data
+
+    conanfile._check_patch_verdict(str(tmp_path))
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("probe_output", [None, "", "Traceback (most recent call last):"])
+def test_failed_probe_leaves_python_values_unknown(conanfile, monkeypatch, probe_output):
+    monkeypatch.setattr(type(conanfile), "_python_info_cache_key", None)
+    monkeypatch.setattr(type(conanfile), "_python_executable", "/usr/bin/python3")
+    monkeypatch.setattr(conanfile, "_run_python_script", lambda script, quiet=False: probe_output)
+
+    assert conanfile._detect_python_version() is None
+    assert conanfile._python_abiflags is None
+    assert conanfile._python_inc is None
+    assert conanfile._get_python_path("include") is None
+    assert conanfile._get_python_sc_var("LIBRARY") is None
+    assert conanfile._get_python_du_var("LIBRARY") is None
+
+
+def test_probe_result_is_parsed_from_the_last_line(conanfile, monkeypatch):
+    info = {"version": "3.11", "abiflags": "", "python_inc": "/usr/include/python3.11",
+            "paths": {"include": "/usr/include/python3.11"}, "sc_vars": {"LIBRARY": "libpython3.11.a"},
+            "du_vars": {}}
+    monkeypatch.setattr(type(conanfile), "_python_info_cache_key", None)
+    monkeypatch.setattr(conanfile, "_run_python_script",
+                        lambda script, quiet=False: "noise\n" + json.dumps(info))
+
+    assert conanfile._detect_python_version() == "3.11"
+    assert conanfile._get_python_path("include") == "/usr/include/python3.11"
+    assert conanfile._get_python_sc_var("LIBRARY") == "libpython3.11.a"
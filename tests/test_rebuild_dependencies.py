@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+
+def _git(*args, cwd=None):
+    return subprocess.check_output(["git"] + list(args), cwd=cwd, text=True).strip()
+
+
+@pytest.fixture
+def boost_mirror(tmp_path, monkeypatch):
+    """
+    Local bare mirrors of a boost superproject with the libs/a and libs/b submodules (relative urls, as boostorg's),
+    tagged boost-1.0.0 and boost-1.1.0; b changes between the two.
+    """
+    for name, value in [("GIT_AUTHOR_NAME", "test"), ("GIT_AUTHOR_EMAIL", "test@example.com"),
+                        ("GIT_COMMITTER_NAME", "test"), ("GIT_COMMITTER_EMAIL", "test@example.com"),
+                        # git refuses file:// submodules unless allowed
+                        ("GIT_CONFIG_COUNT", "1"), ("GIT_CONFIG_KEY_0", "protocol.file.allow"), ("GIT_CONFIG_VALUE_0", "always")]:
+        monkeypatch.setenv(name, value)
+    mirror = tmp_path / "mirror"
+    work = tmp_path / "work"
+    for library in ("a", "b"):
+        _git("init", "-q", "-b", "develop", str(work / library))
+        for i in range(3):
+            (work / library / "include.hpp").write_text(f"// {library} {i}\n")
+            _git("add", ".", cwd=work / library)
+            _git("commit", "-q", "-m", f"{library} {i}", cwd=work / library)
+        _git("clone", "-q", "--bare", str(work / library), str(mirror / f"{library}.git"))
+    _git("init", "-q", "-b", "develop", str(work / "boost"))
+    for library in ("a", "b"):
+        _git("submodule", "add", "-q", str(mirror / f"{library}.git"), f"libs/{library}", cwd=work / "boost")
+    _git("config", "-f", ".gitmodules", "submodule.libs/a.url", "../a.git", cwd=work / "boost")
+    _git("config", "-f", ".gitmodules", "submodule.libs/b.url", "../b.git", cwd=work / "boost")
+    _git("add", ".", cwd=work / "boost")
+    _git("commit", "-q", "-m", "boost 1.0.0", cwd=work / "boost")
+    _git("tag", "boost-1.0.0", cwd=work / "boost")
+    _git("checkout", "-q", "HEAD~1", cwd=work / "boost" / "libs" / "b")
+    _git("commit", "-q", "-am", "boost 1.1.0", cwd=work / "boost")
+    _git("tag", "boost-1.1.0", cwd=work / "boost")
+    _git("clone", "-q", "--bare", str(work / "boost"), str(mirror / "boost.git"))
+    return mirror / "boost.git"
+
+
+def _builder(rebuild_dependencies, tmp_path, boost_mirror, version, **kwargs):
+    return rebuild_dependencies.BoostDependencyBuilder(
+        boost_version=version, boostdep_version="1.75.0", tmppath=tmp_path / "tmp", git_url=str(boost_mirror),
+        outputdir=tmp_path / "dependencies", unsafe=False, incremental_submodules=True, **kwargs)
+
+
+def test_shallow_then_worktrees(rebuild_dependencies, tmp_path, boost_mirror):
+    versions = ["1.0.0", "1.1.0"]
+    (tmp_path / "tmp").mkdir()
+
+    # --shallow -s: shallow boost clone with shallow submodules
+    shallow = _builder(rebuild_dependencies, tmp_path, boost_mirror, "1.0.0", shallow=True)
+    shallow.do_git_update_shallow(versions)
+    shallow.do_git_submodule_update()
+    modules = shallow.boost_path / ".git" / "modules" / "libs" / "a"
+    assert _git("rev-parse", "--is-shallow-repository", cwd=modules) == "true"
+    assert shallow._submodule_reference("libs/a") == []
+
+    # then -j 2 -s: every version in a worktree, with the submodules borrowing the objects of full mirrors
+    builders = [_builder(rebuild_dependencies, tmp_path, boost_mirror, version, worktree=True) for version in versions]
+    builders[0].do_git_submodule_cache_update(versions)
+    for library in ("a", "b"):
+        cache = builders[0].submodule_cache_path / f"libs/{library}"
+        assert _git("rev-parse", "--is-shallow-repository", cwd=cache) == "false"
+    for builder in builders:
+        builder.do_git_worktree_add()
+        builder.do_git_submodule_update()
+        for library in ("a", "b"):
+            git_dir = _git("rev-parse", "--absolute-git-dir", cwd=builder.work_path / "libs" / library)
+            with open(os.path.join(git_dir, "objects", "info", "alternates")) as f:
+                assert f.read().strip() == str((builder.submodule_cache_path / f"libs/{library}" / "objects").resolve())
+    assert _git("rev-parse", "HEAD", cwd=builders[0].work_path / "libs" / "b") != \
+        _git("rev-parse", "HEAD", cwd=builders[1].work_path / "libs" / "b")
+
+    # Mirrors that already hold every pinned commit are not fetched again
+    os.rename(boost_mirror.parent / "a.git", boost_mirror.parent / "a.git.moved")
+    builders[0].do_git_submodule_cache_update(versions)
+
+
+
+def test_fingerprint_of_missing_version(rebuild_dependencies, tmp_path, boost_mirror, capsys):
+    _git("clone", "-q", str(boost_mirror), str(tmp_path / "tmp" / "boost"))
+    builder = _builder(rebuild_dependencies, tmp_path, boost_mirror, "1.0.0")
+    assert builder.fingerprint == _builder(rebuild_dependencies, tmp_path, boost_mirror, "1.0.0").fingerprint
+    assert builder.fingerprint != _builder(rebuild_dependencies, tmp_path, boost_mirror, "1.1.0").fingerprint
+
+    missing = _builder(rebuild_dependencies, tmp_path, boost_mirror, "9.9.9")
+    with pytest.raises(subprocess.CalledProcessError):
+        missing.fingerprint
+    assert "version 9.9.9 does not exist" in capsys.readouterr().out
+
+
+def test_stale_dependency_index_is_regenerated(rebuild_dependencies, tmp_path, monkeypatch):
+    outputdir = tmp_path / "dependencies"
+    outputdir.mkdir()
+    yml_path = outputdir / "dependencies-1.0.0.yml"
+    yml_path.write_text("fingerprint: abc\ndependencies:\n  a: []\n  b: [a]\n")
+    index_path = outputdir / "dependencies-1.0.0.json"
+    builder = rebuild_dependencies.BoostDependencyBuilder(
+        boost_version="1.0.0", boostdep_version="1.75.0", tmppath=tmp_path / "tmp", git_url="",
+        outputdir=outputdir, unsafe=False)
+    monkeypatch.setattr(type(builder), "fingerprint", "abc")
+
+    assert not rebuild_dependencies.dependency_index_is_current(yml_path, index_path)
+    builder.do_dependency_file_update()
+    assert rebuild_dependencies.dependency_index_is_current(yml_path, index_path)
+
+    # an index of another format is written again, although the yml file is up to date
+    index = json.loads(index_path.read_text())
+    index["format"] = rebuild_dependencies.DEPENDENCY_INDEX_FORMAT - 1
+    index_path.write_text(json.dumps(index))
+    assert not rebuild_dependencies.dependency_index_is_current(yml_path, index_path)
+    builder.do_dependency_file_update()
+    assert json.loads(index_path.read_text())["format"] == rebuild_dependencies.DEPENDENCY_INDEX_FORMAT
+
+    # so is the index of an edited yml file
+    yml_path.write_text("fingerprint: abc\ndependencies:\n  a: []\n  b: []\n")
+    assert not rebuild_dependencies.dependency_index_is_current(yml_path, index_path)
+    builder.do_dependency_file_update()
+    assert json.loads(index_path.read_text())["data"]["dependencies"]["b"] == []
@@ -0,0 +1,74 @@
+import bz2
+import io
+import sys
+import tarfile
+
+import pytest
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """
+    boost_1_0_0.tar.bz2 with a root folder, as the boost release archives
+    """
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w") as tar:
+        for name, contents in [("boost_1_0_0/boost/version.hpp", b"#define BOOST_VERSION 100000\n" * 2000),
+                               ("boost_1_0_0/libs/system/src/error_code.cpp", b"// error_code\n"),
+                               ("boost_1_0_0/bootstrap.sh", b"#!/bin/sh\n")]:
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            info.mode = 0o755 if name.endswith(".sh") else 0o644
+            tar.addfile(info, io.BytesIO(contents))
+    path = tmp_path / "boost_1_0_0.tar.bz2"
+    path.write_bytes(bz2.compress(data.getvalue()))
+    return path
+
+
+def _decompressor(tmp_path, fail_after=None):
+    """
+    :return: command line of a bzip2 -dc stand-in, which fails with an error message after fail_after bytes
+    """
+    script = tmp_path / "decompress.py"
+    script.write_text(
+        "import bz2, sys\n"
+        "data = bz2.decompress(open(sys.argv[-1], 'rb').read())\n"
+        f"fail_after = {fail_after!r}\n"
+        "sys.stdout.buffer.write(data if fail_after is None else data[:fail_after])\n"
+        "if fail_after is not None:\n"
+        "    sys.stderr.write('decompress: corrupted block\\n')\n"
+        "    sys.exit(3)\n")
+    return [sys.executable, str(script)]
+
+
+def test_extract_tar_from_command(recipe, archive, tmp_path):
+    destination = tmp_path / "out"
+    recipe.extract_tar_from_command(_decompressor(tmp_path) + [str(archive)], str(destination), strip_root=True)
+    assert (destination / "libs" / "system" / "src" / "error_code.cpp").read_bytes() == b"// error_code\n"
+    assert (destination / "bootstrap.sh").stat().st_mode & 0o100
+
+
+def test_extract_tar_from_failing_command(recipe, archive, tmp_path):
+    with pytest.raises(recipe.ConanException, match="failed with exit code 3: decompress: corrupted block"):
+        recipe.extract_tar_from_command(_decompressor(tmp_path, fail_after=10000) + [str(archive)], str(tmp_path / "out"))
+
+
+def test_get_sources_falls_back_to_python(recipe, conanfile, archive, tmp_path, monkeypatch):
+    decompressor = _decompressor(tmp_path, fail_after=10000)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(recipe.tools, "which", lambda name: "lbzip2" if name == "lbzip2" else None)
+    monkeypatch.setattr(recipe, "download", lambda conanfile, urls, filename, sha256: archive.rename(filename))
+    real_extract = recipe.extract_tar_from_command
+    monkeypatch.setattr(recipe, "extract_tar_from_command",
+                        lambda command, *args, **kwargs: real_extract(decompressor + command[2:], *args, **kwargs))
+    conanfile.version = "1.0.0"
+    conanfile.conan_data = {"sources": {"1.0.0": {"url": "https://example.com/boost_1_0_0.tar.bz2", "sha256": "0"}}}
+    output = io.StringIO()
+    monkeypatch.setattr(conanfile.output, "_stream", output)
+    monkeypatch.setattr(conanfile.output, "_stream_err", output)
+
+    conanfile._get_sources()
+    assert (tmp_path / "source_subfolder" / "boost" / "version.hpp").read_bytes() == b"#define BOOST_VERSION 100000\n" * 2000
+    assert not (tmp_path / "boost_1_0_0.tar.bz2").exists()
+    assert "decompress: corrupted block" in output.getvalue()
+    assert "with python instead" in output.getvalue()
@@ -0,0 +1,62 @@
+import pytest
+
+
+class _Options:
+    def __init__(self, **values):
+        self._values = values
+
+    def get_safe(self, name, default=None):
+        return self._values.get(name, default)
+
+
+def test_compiler_launcher_is_resolved_with_the_toolchain(recipe, conanfile, monkeypatch):
+    which_calls = []
+
+    def which(name):
+        which_calls.append(name)
+        return "/opt/bin/ccache" if name == "ccache" else None
+
+    monkeypatch.setattr(recipe.tools, "which", which)
+    conanfile.options = _Options(compiler_launcher="ccache")
+    assert conanfile._detect_compiler_launcher() == "/opt/bin/ccache"
+    assert which_calls == ["ccache"]
+
+    conanfile._cached_toolchain = {"compiler_launcher": "/opt/bin/ccache"}
+    for _ in range(3):
+        assert conanfile._compiler_launcher == "/opt/bin/ccache"
+        assert conanfile._compiler_launcher_name == "ccache"
+    assert which_calls == ["ccache"]
+
+    conanfile.options = _Options(compiler_launcher="sccache")
+    with pytest.raises(recipe.ConanException, match="Cannot find compiler_launcher sccache"):
+        conanfile._detect_compiler_launcher()
+    conanfile.options = _Options()
+    assert conanfile._compiler_launcher is None
+
+
+
+def test_compiler_launcher_stats_are_parsed(recipe):
+    ccache = "stats_updated_timestamp\t1700000000\ndirect_cache_hit\t12\npreprocessed_cache_hit\t3\ncache_miss\t5\n"
+    assert recipe.parse_compiler_launcher_stats("ccache", ccache) == {
+        "direct_cache_hit": 12, "preprocessed_cache_hit": 3, "cache_miss": 5}
+    sccache = ('{"stats": {"compile_requests": 20, "cache_hits": {"counts": {"C/C++": 7}, "adv_counts": {}},'
+               ' "cache_misses": {"counts": {"C/C++": 2}}, "cache_write_duration": {"secs": 1, "nanos": 0}}}')
+    assert recipe.parse_compiler_launcher_stats("sccache", sccache) == {
+        "compile_requests": 20, "cache_hits": 7, "cache_misses": 2}
+    assert recipe.parse_compiler_launcher_stats("sccache", "not json") is None
+    assert recipe.parse_compiler_launcher_stats("ccache", "Usage: ccache [options]") is None
+
+
+def test_compiler_launcher_stats_of_the_build_are_reported(conanfile, monkeypatch):
+    conanfile.options = _Options(compiler_launcher="ccache")
+    conanfile._cached_toolchain = {"compiler_launcher": "/opt/bin/ccache"}
+    monkeypatch.setattr(conanfile, "_compiler_launcher_stats",
+                        lambda: {"direct_cache_hit": 112, "preprocessed_cache_hit": 10, "cache_miss": 55,
+                                 "files_in_cache": 1000})
+
+    conanfile._report_compiler_launcher_stats({"direct_cache_hit": 100, "preprocessed_cache_hit": 10,
+                                               "cache_miss": 51, "files_in_cache": 990})
+
+    output = conanfile.output._stream.getvalue()
+    assert "ccache statistics of this build: 12 hits, 4 misses (75.0% hit rate)" in output
+    assert "files_in_cache: 10" in output
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import shutil
+import stat
+import subprocess
+
+import pytest
+
+JAMFILE = """\
+project boost/filesystem : source-location ../src ;
+
+SOURCES = codecvt_error_category exception operations path ;
+
+lib boost_filesystem : $(SOURCES).cpp : <link>static ;
+"""
+
+
+def _tree_state(folder):
+    state = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                state[os.path.relpath(path, folder)] = (hashlib.sha256(f.read()).hexdigest(), os.stat(path).st_mode)
+    return state
+
+
+@pytest.fixture
+def boost_tree(conanfile, tmp_path, monkeypatch):
+    source_folder = tmp_path / "source"
+    root = source_folder / "source_subfolder"
+    (root / "libs" / "filesystem" / "build").mkdir(parents=True)
+    (root / "libs" / "filesystem" / "src").mkdir()
+    (root / "Jamroot").write_text("project boost ;\nbuild-project libs/filesystem/build ;\n")
+    (root / "libs" / "filesystem" / "build" / "Jamfile.v2").write_text(JAMFILE)
+    os.chmod(root / "libs" / "filesystem" / "build" / "Jamfile.v2", 0o644)
+    for i, name in enumerate(["codecvt_error_category", "exception", "operations", "path"]):
+        # the same file scope name in every source: only operations, which is excluded, may not see the others
+        (root / "libs" / "filesystem" / "src" / f"{name}.cpp").write_text(
+            f"namespace {{ int helper_{i}() {{ return {i}; }} }}\nint {name}_value() {{ return helper_{i}(); }}\n")
+    conanfile.folders.set_base_source(str(source_folder))
+    monkeypatch.setattr(type(conanfile), "_built_modules", {"filesystem", "system"})
+    return root
+
+
+def test_unity_build_leaves_sources_untouched(conanfile, boost_tree):
+    before = _tree_state(boost_tree)
+    root = conanfile._configure_unity_build("source_subfolder")
+    assert _tree_state(boost_tree) == before
+    assert root == conanfile._unity_root
+
+    unity_source = os.path.join(conanfile.build_folder, "unity", "filesystem", "filesystem_unity_sources.cpp")
+    with open(unity_source) as f:
+        assert [line.split("/")[-1] for line in f.read().splitlines()[1:]] == [
+            'codecvt_error_category.cpp"', 'exception.cpp"', 'path.cpp"']
+    jamfile = os.path.join(root, "libs", "filesystem", "build", "Jamfile.v2")
+    with open(jamfile) as f:
+        contents = f.read()
+    assert "SOURCES = operations ;" in contents
+    assert f"$(SOURCES).cpp {unity_source}" in contents
+    assert stat.S_IMODE(os.stat(jamfile).st_mode) == 0o644
+    assert os.path.samefile(os.path.join(root, "libs", "filesystem", "src", "path.cpp"),
+                            boost_tree / "libs" / "filesystem" / "src" / "path.cpp")
+
+    # Unchanged jumbo sources keep their mtime, so b2 does not rebuild them
+    mtime = os.stat(unity_source).st_mtime_ns
+    conanfile._configure_unity_build("source_subfolder")
+    assert os.stat(unity_source).st_mtime_ns == mtime
+    assert _tree_state(boost_tree) == before
+
+
+@pytest.mark.skipif(not shutil.which("b2") or not shutil.which("g++"), reason="needs b2 and g++")
+def test_unity_build_with_b2(conanfile, boost_tree, tmp_path):
+    before = _tree_state(boost_tree)
+    root = conanfile._configure_unity_build("source_subfolder")
+    (tmp_path / "user-config.jam").write_text("using gcc ;\n")
+    subprocess.check_call(["b2", f"--user-config={tmp_path / 'user-config.jam'}", f"--build-dir={tmp_path / 'bin'}",
+                           "toolset=gcc", "-j2", "-q", "-d0"], cwd=root)
+    objects = sorted(name for _, _, names in os.walk(tmp_path / "bin") for name in names if name.endswith(".o"))
+    assert objects == ["filesystem_unity_sources.o", "operations.o"]
+    assert _tree_state(boost_tree) == before